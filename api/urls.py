@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.index, name='index'),
+    path('export/', views.export, name='export'),
+    path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    path('<str:username>/', views.profile, name='profile'),
+]
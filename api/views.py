@@ -0,0 +1,115 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
+from django.views.decorators.http import require_safe
+
+from posts.cache import (author_generation_key, group_generation_key,
+                         index_generation_key)
+from posts.conditional import feed_condition
+from posts.export import (EXPORT_FORMATS, export_lines, export_queryset,
+                          iter_rows)
+from posts.feeds import FEED_VALUES, FeedQuery
+from posts.models import Group, User
+from posts.paginator import CursorPaginator, InvalidCursor, decode_cursor
+
+API_PER_PAGE = 20
+
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def page_url(request, name, cursor):
+    if cursor is None:
+        return None
+    return f"{request.path}?{urlencode({name: cursor})}"
+
+
+def stream_page(request, page):
+    # The page is written out row by row, so a response never exists as
+    # one big string in memory.
+    yield '{"results":['
+    for number, row in enumerate(page):
+        item = {name: value for (name, _), value in zip(FEED_VALUES, row)}
+        yield ("," if number else "") + encoder.encode(item)
+    yield '],"next":%s,"previous":%s}' % (
+        json.dumps(page_url(request, "after", page.next_cursor)),
+        json.dumps(page_url(request, "before", page.previous_cursor)),
+    )
+
+
+def feed_response(request, feed):
+    paginator = CursorPaginator(feed.values_list(), API_PER_PAGE)
+    page = paginator.get_page(
+        after=request.GET.get("after"),
+        before=request.GET.get("before")
+    )
+    return StreamingHttpResponse(
+        stream_page(request, page), content_type="application/json"
+    )
+
+
+@require_safe
+@feed_condition(index_generation_key, "API_CONDITIONAL_GET")
+def index(request):
+    return feed_response(request, FeedQuery.index())
+
+
+@require_safe
+@feed_condition(group_generation_key, "API_CONDITIONAL_GET")
+def group_posts(request, slug):
+    group = get_object_or_404(Group.objects.only("id"), slug=slug)
+    return feed_response(request, FeedQuery.for_group(group))
+
+
+@require_safe
+@feed_condition(author_generation_key, "API_CONDITIONAL_GET")
+def profile(request, username):
+    author = get_object_or_404(User.objects.only("id"), username=username)
+    return feed_response(request, FeedQuery.for_author(author))
+
+
+@require_safe
+def export(request):
+    export_format = request.GET.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("Unknown format")
+    filters = {}
+    for name in ("since", "until"):
+        if request.GET.get(name):
+            try:
+                filters[name] = parse_date(request.GET[name])
+            except ValueError:
+                filters[name] = None
+            if filters[name] is None:
+                return HttpResponseBadRequest(f"Invalid {name}")
+    after = request.GET.get("after")
+    if after:
+        try:
+            decode_cursor(after)
+        except InvalidCursor:
+            return HttpResponseBadRequest("Invalid cursor")
+    if request.GET.get("group"):
+        filters["group"] = get_object_or_404(
+            Group.objects.only("id"), slug=request.GET["group"]
+        )
+    if request.GET.get("author"):
+        filters["author"] = get_object_or_404(
+            User.objects.only("id"), username=request.GET["author"]
+        )
+    rows = iter_rows(export_queryset(**filters), after=after)
+    response = StreamingHttpResponse(
+        export_lines(rows, export_format),
+        content_type=EXPORT_CONTENT_TYPES[export_format]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="posts.{export_format}"'
+    )
+    return response
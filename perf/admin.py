@@ -0,0 +1,90 @@
+import json
+
+from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+
+from .models import MemorySample, Profile
+
+
+class ProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        "created", "method", "path", "url_name", "status", "duration_ms",
+        "samples", "user", "download",
+    )
+    list_filter = ("url_name",)
+    list_select_related = ("user",)
+    exclude = ("folded",)
+    readonly_fields = (
+        "created", "user", "method", "path", "url_name", "status",
+        "duration_ms", "samples", "download",
+    )
+    empty_value_display = "-пусто-"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def download(self, obj):
+        url = reverse("admin:perf_profile_download", args=(obj.pk,))
+        return format_html('<a href="{}">folded</a>', url)
+    download.short_description = "Скачать"
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="perf_profile_download",
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        profile = get_object_or_404(Profile, pk=pk)
+        response = HttpResponse(
+            profile.folded, content_type="text/plain; charset=utf-8"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="profile-{profile.pk}.folded"'
+        )
+        return response
+
+
+class MemorySampleAdmin(admin.ModelAdmin):
+    list_display = (
+        "created", "method", "path", "url_name", "status", "peak_bytes",
+        "retained_bytes",
+    )
+    list_filter = ("url_name",)
+    exclude = ("sites",)
+    readonly_fields = (
+        "created", "method", "path", "url_name", "status", "peak_bytes",
+        "retained_bytes", "top_sites",
+    )
+    empty_value_display = "-пусто-"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def top_sites(self, obj):
+        return format_html_join(
+            "\n", "<div>{} — {} байт, {} блоков</div>",
+            (
+                (site["site"], site["size"], site["count"])
+                for site in json.loads(obj.sites)
+            )
+        )
+    top_sites.short_description = "Места выделения"
+
+
+admin.site.register(Profile, ProfileAdmin)
+admin.site.register(MemorySample, MemorySampleAdmin)
@@ -0,0 +1,46 @@
+import time
+
+from django.core.cache.backends import locmem
+
+from .timing import current
+
+MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    """Counts hits and misses of ``get`` and ``get_many`` for measured
+    requests."""
+
+    def get(self, key, default=None, version=None):
+        timings = current.get()
+        if timings is None:
+            return super().get(key, default, version)
+        started = time.perf_counter()
+        value = super().get(key, MISSING, version)
+        timings.cache += time.perf_counter() - started
+        if value is MISSING:
+            timings.cache_misses += 1
+            return default
+        timings.cache_hits += 1
+        return value
+
+    def get_many(self, keys, version=None):
+        timings = current.get()
+        if timings is None:
+            return super().get_many(keys, version)
+        keys = list(keys)
+        started = time.perf_counter()
+        # The base implementation goes through get() for every key
+        token = current.set(None)
+        try:
+            found = super().get_many(keys, version)
+        finally:
+            current.reset(token)
+        timings.cache += time.perf_counter() - started
+        timings.cache_hits += len(found)
+        timings.cache_misses += len(keys) - len(found)
+        return found
+
+
+class LocMemCache(InstrumentedCacheMixin, locmem.LocMemCache):
+    pass
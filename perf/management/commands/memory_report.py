@@ -0,0 +1,21 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from perf.memory import report
+from perf.models import MemorySample
+
+
+class Command(BaseCommand):
+    help = "Сводка пиков памяти и мест выделения по именам адресов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--view", help="только это имя адреса")
+
+    def handle(self, *args, **options):
+        samples = MemorySample.objects.all()
+        if options["view"]:
+            samples = samples.filter(url_name=options["view"])
+        self.stdout.write(json.dumps(
+            report(samples.iterator()), ensure_ascii=False, indent=2
+        ))
@@ -0,0 +1,154 @@
+import collections
+import json
+import os
+import random
+import threading
+import tracemalloc
+
+from django.conf import settings
+
+from . import metrics
+from .middleware import url_name
+
+# tracemalloc is process wide: one request is tracked at a time, and
+# allocations of other threads running meanwhile are counted with it.
+tracking = threading.Lock()
+
+
+def project_frame(traceback):
+    """The innermost frame in the project's own code, which is the line to
+    look at even when the memory was allocated deep inside Django."""
+    for frame in reversed(traceback):
+        filename = frame.filename
+        if (filename.startswith(settings.BASE_DIR)
+                and "site-packages" not in filename):
+            return frame
+    return traceback[-1]
+
+
+def site_label(frame):
+    filename = frame.filename
+    if filename.startswith(settings.BASE_DIR):
+        filename = os.path.relpath(filename, settings.BASE_DIR)
+    return f"{filename}:{frame.lineno}"
+
+
+def allocations(before, after):
+    """(traceback, size, count) of memory allocated between the snapshots
+    and still held."""
+    if before is None:
+        for stat in after.statistics("traceback"):
+            yield stat.traceback, stat.size, stat.count
+        return
+    for stat in after.compare_to(before, "traceback"):
+        if stat.size_diff > 0:
+            yield stat.traceback, stat.size_diff, stat.count_diff
+
+
+def top_sites(allocated, limit):
+    sizes = collections.Counter()
+    counts = collections.Counter()
+    for traceback, size, count in allocated:
+        site = site_label(project_frame(traceback))
+        sizes[site] += size
+        counts[site] += count
+    return [
+        {"site": site, "size": size, "count": counts[site]}
+        for site, size in sizes.most_common(limit)
+    ]
+
+
+class MemoryMiddleware:
+    """Tracks allocations of a PERF_MEMORY_SAMPLE_RATE share of requests.
+
+    The peak is the highest traced size during the request, so querysets
+    and page lists freed before the response count too. Sites list what
+    is still allocated when the response leaves the view, attributed to
+    the innermost line of project code. Samples are stored as
+    :class:`~perf.models.MemorySample` and the peak feeds /metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.PERF_MEMORY_SAMPLE_RATE
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+        if not tracking.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self.track(request)
+        finally:
+            tracking.release()
+
+    def track(self, request):
+        from .models import MemorySample
+
+        # Tracing started for this request only sees its own allocations;
+        # if it was already on, the difference to a snapshot is taken.
+        started_here = not tracemalloc.is_tracing()
+        before = None
+        if started_here:
+            tracemalloc.start(settings.PERF_MEMORY_FRAMES)
+        else:
+            before = tracemalloc.take_snapshot()
+        try:
+            # reset_peak() appeared in Python 3.9; before that the peak of
+            # an already running trace may include earlier allocations.
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            start_size = tracemalloc.get_traced_memory()[0]
+            response = self.get_response(request)
+            size, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+        finally:
+            if started_here:
+                tracemalloc.stop()
+        view = url_name(request)
+        sites = top_sites(
+            allocations(before, after), settings.PERF_MEMORY_TOP_SITES
+        )
+        MemorySample.objects.create(
+            method=request.method,
+            path=request.get_full_path(),
+            url_name=view,
+            status=response.status_code,
+            peak_bytes=peak - start_size,
+            retained_bytes=size - start_size,
+            sites=json.dumps(sites),
+        )
+        stale = MemorySample.objects.values_list("pk", flat=True)[
+            settings.PERF_MEMORY_KEEP:
+        ]
+        MemorySample.objects.filter(pk__in=list(stale)).delete()
+        metrics.observe_memory(view, peak - start_size)
+        return response
+
+
+def report(samples):
+    """Peak statistics and top sites per URL name over ``samples``."""
+    views = {}
+    for sample in samples:
+        view = views.setdefault(sample.url_name, {
+            "requests": 0,
+            "peak_max": 0,
+            "peak_total": 0,
+            "sites": collections.Counter(),
+        })
+        view["requests"] += 1
+        view["peak_max"] = max(view["peak_max"], sample.peak_bytes)
+        view["peak_total"] += sample.peak_bytes
+        for site in json.loads(sample.sites):
+            view["sites"][site["site"]] += site["size"]
+    return {
+        name: {
+            "requests": view["requests"],
+            "peak_max": view["peak_max"],
+            "peak_mean": view["peak_total"] // view["requests"],
+            "sites": view["sites"].most_common(10),
+        }
+        for name, view in sorted(
+            views.items(), key=lambda item: -item[1]["peak_max"]
+        )
+    }
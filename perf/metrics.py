@@ -0,0 +1,193 @@
+"""
+Request metrics in the Prometheus text format.
+
+Every worker process keeps its histograms in memory and, when
+PERF_METRICS_DIR is set, writes them to ``<pid>.json`` in that directory at
+most every PERF_METRICS_FLUSH_INTERVAL seconds. ``/metrics`` adds up the
+files of all running workers on the host, so it can be served by any of
+them. A worker removes its file on exit; files of workers that are gone
+otherwise are removed by the next ``/metrics``.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+# (name, help, label values are URL names, bucket upper bounds)
+HISTOGRAMS = (
+    (
+        "yatube_request_duration_seconds",
+        "Time to produce the response",
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    ),
+    (
+        "yatube_request_queries",
+        "SQL queries per request",
+        (0, 1, 2, 3, 5, 10, 20, 50, 100),
+    ),
+    (
+        "yatube_response_size_bytes",
+        "Size of the response body",
+        (1024, 4096, 16384, 65536, 262144, 1048576),
+    ),
+    (
+        "yatube_request_peak_memory_bytes",
+        "Peak traced allocation of memory-sampled requests",
+        (2 ** 16, 2 ** 18, 2 ** 20, 2 ** 22, 2 ** 24, 2 ** 26, 2 ** 28),
+    ),
+)
+
+BUCKETS = {name: buckets for name, _, buckets in HISTOGRAMS}
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def worker_pid(path):
+    try:
+        return int(os.path.basename(path)[:-len(".json")])
+    except ValueError:
+        return None
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.flushed = 0.0
+        # {metric: {view: [bucket counts..., +Inf count, sum]}}
+        self.data = {name: {} for name in BUCKETS}
+
+    def observe(self, metric, view, value):
+        buckets = BUCKETS[metric]
+        with self.lock:
+            if self.pid != os.getpid():
+                # Forked worker: start from zero, the parent reports its own
+                self.reset()
+            series = self.data[metric].setdefault(
+                view, [0] * (len(buckets) + 2)
+            )
+            series[bisect_left(buckets, value)] += 1
+            series[-1] += value
+        self.maybe_flush()
+
+    def path(self):
+        return os.path.join(settings.PERF_METRICS_DIR, f"{self.pid}.json")
+
+    def flush(self):
+        if not settings.PERF_METRICS_DIR:
+            return
+        with self.lock:
+            data = json.dumps(self.data)
+            self.flushed = time.monotonic()
+        os.makedirs(settings.PERF_METRICS_DIR, exist_ok=True)
+        # Readers never see a half-written file
+        temporary = f"{self.path()}.tmp"
+        with open(temporary, "w") as output:
+            output.write(data)
+        os.replace(temporary, self.path())
+
+    def discard(self):
+        # Forked workers that never observed a request still carry the
+        # pid of their parent
+        if settings.PERF_METRICS_DIR and self.pid == os.getpid():
+            try:
+                os.remove(self.path())
+            except OSError:
+                pass
+
+    def maybe_flush(self):
+        interval = settings.PERF_METRICS_FLUSH_INTERVAL
+        if time.monotonic() - self.flushed >= interval:
+            self.flush()
+
+    def collect(self):
+        """Histograms of all workers on the host added together."""
+        self.flush()
+        with self.lock:
+            snapshots = [json.loads(json.dumps(self.data))]
+        if settings.PERF_METRICS_DIR:
+            pattern = os.path.join(settings.PERF_METRICS_DIR, "*.json")
+            for path in glob.glob(pattern):
+                if path == self.path():
+                    continue
+                pid = worker_pid(path)
+                if pid is not None and not is_running(pid):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                try:
+                    with open(path) as source:
+                        snapshots.append(json.load(source))
+                except (OSError, ValueError):
+                    continue
+        total = {name: {} for name in BUCKETS}
+        for snapshot in snapshots:
+            for metric, views in snapshot.items():
+                if metric not in total:
+                    continue
+                for view, series in views.items():
+                    summed = total[metric].setdefault(view, [0] * len(series))
+                    for index, value in enumerate(series):
+                        summed[index] += value
+        return total
+
+
+registry = Registry()
+atexit.register(registry.discard)
+
+
+def observe_request(view, seconds, queries):
+    registry.observe("yatube_request_duration_seconds", view, seconds)
+    registry.observe("yatube_request_queries", view, queries)
+
+
+def observe_size(view, size):
+    registry.observe("yatube_response_size_bytes", view, size)
+
+
+def observe_memory(view, peak):
+    registry.observe("yatube_request_peak_memory_bytes", view, peak)
+
+
+def number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(data):
+    lines = []
+    for name, help_text, buckets in HISTOGRAMS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for view, series in sorted(data[name].items()):
+            label = view.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, count in zip(buckets + ("+Inf",), series):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{view="{label}",le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(f'{name}_count{{view="{label}"}} {cumulative}')
+            lines.append(
+                f'{name}_sum{{view="{label}"}} {number(series[-1])}'
+            )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,77 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+from .timing import Timings, current, record_query
+
+logger = logging.getLogger("perf")
+
+
+def url_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else "unknown"
+
+
+def counted(content, view):
+    size = 0
+    for chunk in content:
+        size += len(chunk)
+        yield chunk
+    metrics.observe_size(view, size)
+
+
+class ServerTimingMiddleware:
+    """Measures requests for PERF_METRICS and a PERF_SAMPLE_RATE share of
+    them for Server-Timing.
+
+    Sampled responses get a ``Server-Timing`` header with the database,
+    template and cache time and the total, and the same numbers are logged
+    as one JSON line keyed by the URL name. With both off, requests pass
+    through untouched. Streaming bodies are produced after the timing ends;
+    only their size is recorded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.PERF_SAMPLE_RATE
+        sampled = bool(rate) and random.random() < rate
+        if not sampled and not settings.PERF_METRICS:
+            return self.get_response(request)
+        timings = Timings()
+        token = current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        timings.finish()
+        view = url_name(request)
+        if settings.PERF_METRICS:
+            metrics.observe_request(view, timings.total, timings.queries)
+            if response.streaming:
+                response.streaming_content = counted(
+                    response.streaming_content, view
+                )
+            else:
+                metrics.observe_size(view, len(response.content))
+        if sampled:
+            response["Server-Timing"] = timings.header()
+            record = {
+                "url_name": view,
+                "method": request.method,
+                "status": response.status_code,
+                **timings.as_dict(),
+            }
+            logger.info(json.dumps(record), extra={"timings": record})
+        return response
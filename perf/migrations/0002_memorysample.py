@@ -0,0 +1,32 @@
+# Generated by Django 2.2.6 on 2026-10-18 05:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('perf', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemorySample',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата')),
+                ('method', models.CharField(max_length=10, verbose_name='Метод')),
+                ('path', models.TextField(verbose_name='Адрес')),
+                ('url_name', models.CharField(db_index=True, max_length=200, verbose_name='Имя адреса')),
+                ('status', models.PositiveSmallIntegerField(verbose_name='Статус')),
+                ('peak_bytes', models.BigIntegerField(verbose_name='Пик, байт')),
+                ('retained_bytes', models.BigIntegerField(verbose_name='Осталось, байт')),
+                ('sites', models.TextField(verbose_name='Места выделения')),
+            ],
+            options={
+                'verbose_name': 'замер памяти',
+                'verbose_name_plural': 'замеры памяти',
+                'ordering': ('-created', '-id'),
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db import models
+
+
+class Profile(models.Model):
+    created = models.DateTimeField("Дата", auto_now_add=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        verbose_name="Пользователь"
+    )
+    method = models.CharField("Метод", max_length=10)
+    path = models.TextField("Адрес")
+    url_name = models.CharField("Имя адреса", max_length=200)
+    status = models.PositiveSmallIntegerField("Статус")
+    duration_ms = models.FloatField("Время, мс")
+    samples = models.PositiveIntegerField("Выборок")
+    # Folded stacks, one "frame;frame;frame count" line per stack, as read
+    # by flamegraph.pl, speedscope and inferno
+    folded = models.TextField("Стеки")
+
+    class Meta:
+        ordering = ("-created", "-id")
+        verbose_name = "профиль запроса"
+        verbose_name_plural = "профили запросов"
+
+    def __str__(self):
+        return f"{self.created} {self.method} {self.path}"
+
+
+class MemorySample(models.Model):
+    created = models.DateTimeField("Дата", auto_now_add=True)
+    method = models.CharField("Метод", max_length=10)
+    path = models.TextField("Адрес")
+    url_name = models.CharField("Имя адреса", max_length=200, db_index=True)
+    status = models.PositiveSmallIntegerField("Статус")
+    peak_bytes = models.BigIntegerField("Пик, байт")
+    retained_bytes = models.BigIntegerField("Осталось, байт")
+    # JSON list of {"site": "file:line", "size": bytes, "count": blocks}
+    sites = models.TextField("Места выделения")
+
+    class Meta:
+        ordering = ("-created", "-id")
+        verbose_name = "замер памяти"
+        verbose_name_plural = "замеры памяти"
+
+    def __str__(self):
+        return f"{self.created} {self.url_name} {self.peak_bytes}"
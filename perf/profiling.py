@@ -0,0 +1,136 @@
+import collections
+import os
+import sys
+import threading
+import time
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib import auth
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_PARAM = "_profile"
+
+# One profiled request at a time per process; other requests asking for a
+# profile meanwhile are served without one.
+running = threading.Lock()
+
+
+def frame_label(code):
+    return (
+        f"{code.co_name} "
+        f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class Sampler(threading.Thread):
+    """Samples the stack of one thread every ``interval`` seconds, up to
+    ``max_samples`` times, into folded stack counts."""
+
+    def __init__(self, thread_id, interval, max_samples):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_samples = max_samples
+        self.counts = collections.Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+            if self.samples >= self.max_samples:
+                return
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def folded(self):
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in self.counts.most_common()
+        )
+
+
+def requested(request):
+    return PROFILE_HEADER in request.META or PROFILE_PARAM in request.GET
+
+
+def staff_user(request):
+    # Runs before the session and authentication middleware, so the user
+    # is read from the session cookie here; only for flagged requests.
+    engine = import_module(settings.SESSION_ENGINE)
+    session = engine.SessionStore(
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    user = auth.get_user(SimpleNamespace(session=session))
+    if user.is_active and user.is_staff:
+        return user
+    return None
+
+
+class ProfilerMiddleware:
+    """Profiles a single request of a staff user flagged with the
+    ``X-Profile`` header or the ``_profile`` query parameter.
+
+    Sits first in MIDDLEWARE, so the sample covers every other middleware,
+    the view and the templates. The profile is stored as a
+    :class:`~perf.models.Profile` and its id returned in ``X-Profile-Id``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not requested(request):
+            return self.get_response(request)
+        user = staff_user(request)
+        if user is None or not running.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self.profile(request, user)
+        finally:
+            running.release()
+
+    def profile(self, request, user):
+        from .models import Profile
+
+        sampler = Sampler(
+            threading.get_ident(),
+            settings.PERF_PROFILE_INTERVAL,
+            settings.PERF_PROFILE_MAX_SAMPLES,
+        )
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        duration = time.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        profile = Profile.objects.create(
+            user=user,
+            method=request.method,
+            path=request.get_full_path(),
+            url_name=match.view_name if match else "unknown",
+            status=response.status_code,
+            duration_ms=duration * 1000,
+            samples=sampler.samples,
+            folded=sampler.folded(),
+        )
+        stale = Profile.objects.values_list("pk", flat=True)[
+            settings.PERF_PROFILE_KEEP:
+        ]
+        Profile.objects.filter(pk__in=list(stale)).delete()
+        response["X-Profile-Id"] = str(profile.pk)
+        return response
@@ -0,0 +1,92 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from perf.memory import MemoryMiddleware
+from perf.metrics import registry
+from perf.models import MemorySample
+from posts.models import Post, User
+
+kept = []
+
+
+def materializing_view(request):
+    rows = [str(number) * 10 for number in range(20000)]
+    return HttpResponse(str(len(rows)))
+
+
+def retaining_view(request):
+    kept.append([str(number) * 10 for number in range(10000)])
+    return HttpResponse("ok")
+
+
+@override_settings(PERF_MEMORY_SAMPLE_RATE=1, PERF_MEMORY_FRAMES=10)
+class MemoryTest(TestCase):
+    def setUp(self):
+        kept.clear()
+        registry.reset()
+        self.factory = RequestFactory()
+
+    def track(self, view):
+        MemoryMiddleware(view)(self.factory.get("/"))
+        return MemorySample.objects.latest("id")
+
+    def test_peak_includes_freed_objects(self):
+        sample = self.track(materializing_view)
+        self.assertGreater(sample.peak_bytes, 800_000)
+        self.assertLess(sample.retained_bytes, sample.peak_bytes / 10)
+
+    def test_sites_point_at_project_code(self):
+        sample = self.track(retaining_view)
+        sites = json.loads(sample.sites)
+        self.assertTrue(sites[0]["site"].startswith(
+            "perf/tests/test_memory.py:"
+        ))
+        self.assertGreater(sites[0]["size"], 400_000)
+
+    @override_settings(PERF_MEMORY_SAMPLE_RATE=0)
+    def test_off_by_default(self):
+        MemoryMiddleware(materializing_view)(self.factory.get("/"))
+        self.assertFalse(MemorySample.objects.exists())
+
+    @override_settings(PERF_METRICS_IPS=["127.0.0.1"])
+    def test_requests_are_aggregated_per_url_name(self):
+        user = User.objects.create_user(username="testuser")
+        Post.objects.create(text="Тестовый пост", author=user)
+        client = Client()
+        client.get(reverse("index"))
+        client.get(reverse("index"))
+        self.assertEqual(
+            MemorySample.objects.filter(url_name="index").count(), 2
+        )
+        self.assertIn(
+            'yatube_request_peak_memory_bytes_count{view="index"} 2',
+            client.get(reverse("perf:metrics")).content.decode()
+        )
+        out = io.StringIO()
+        call_command("memory_report", "--view=index", stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["index"]["requests"], 2)
+        self.assertGreater(report["index"]["peak_max"], 0)
+
+    @override_settings(PERF_MEMORY_KEEP=1)
+    def test_only_latest_samples_are_kept(self):
+        self.track(materializing_view)
+        latest = self.track(materializing_view)
+        self.assertEqual(list(MemorySample.objects.all()), [latest])
+
+    def test_admin_shows_sites(self):
+        sample = self.track(retaining_view)
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse("admin:perf_memorysample_change", args=(sample.pk,))
+        )
+        self.assertContains(response, "perf/tests/test_memory.py:")
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import re
+import tempfile
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from perf.metrics import HISTOGRAMS, observe_request, registry
+from posts.models import Post, User
+
+
+def child_requests(flushed=None, done=None):
+    for _ in range(3):
+        observe_request("index", 0.2, 4)
+    registry.flush()
+    if flushed is not None:
+        # Stay alive while the parent collects
+        flushed.set()
+        done.wait(10)
+
+
+def sample(body, series):
+    match = re.search(rf"^{re.escape(series)} (\S+)$", body, re.MULTILINE)
+    return match and float(match[1])
+
+
+@override_settings(PERF_METRICS=True, PERF_METRICS_IPS=["127.0.0.1"])
+class MetricsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        Post.objects.create(text="Тестовый пост", author=cls.user)
+
+    def setUp(self):
+        registry.reset()
+        self.guest_client = Client()
+
+    def metrics(self):
+        response = self.guest_client.get(reverse("perf:metrics"))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_histograms_per_url_name(self):
+        self.guest_client.get(reverse("index"))
+        self.guest_client.get(reverse("index"))
+        self.guest_client.get(
+            reverse("profile", kwargs={"username": "testuser"})
+        )
+        body = self.metrics()
+        self.assertIn("# TYPE yatube_request_duration_seconds histogram", body)
+        self.assertEqual(sample(
+            body, 'yatube_request_duration_seconds_count{view="index"}'
+        ), 2)
+        self.assertEqual(sample(
+            body, 'yatube_request_queries_bucket{view="profile",le="+Inf"}'
+        ), 1)
+        self.assertGreater(sample(
+            body, 'yatube_response_size_bytes_sum{view="index"}'
+        ), 0)
+
+    def test_buckets_are_cumulative(self):
+        for queries in (0, 1, 7):
+            observe_request("post", 0.01, queries)
+        body = self.metrics()
+        counts = [
+            sample(body, f'yatube_request_queries_bucket{{view="post",'
+                         f'le="{bound}"}}')
+            for bound in (0, 1, 5, 10, "+Inf")
+        ]
+        self.assertEqual(counts, [1, 2, 2, 3, 3])
+
+    def test_workers_are_added_up(self):
+        context = multiprocessing.get_context("fork")
+        flushed, done = context.Event(), context.Event()
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(PERF_METRICS_DIR=directory):
+                observe_request("index", 0.1, 2)
+                child = context.Process(
+                    target=child_requests, args=(flushed, done)
+                )
+                child.start()
+                flushed.wait(10)
+                try:
+                    body = self.metrics()
+                finally:
+                    done.set()
+                    child.join()
+        self.assertEqual(sample(
+            body, 'yatube_request_duration_seconds_count{view="index"}'
+        ), 4)
+
+    def test_files_of_exited_workers_are_dropped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(PERF_METRICS_DIR=directory):
+                child = multiprocessing.get_context("fork").Process(
+                    target=child_requests
+                )
+                child.start()
+                child.join()
+                self.assertEqual(len(os.listdir(directory)), 1)
+                body = self.metrics()
+                self.assertEqual(
+                    os.listdir(directory), [f"{os.getpid()}.json"]
+                )
+        self.assertIsNone(sample(
+            body, 'yatube_request_duration_seconds_count{view="index"}'
+        ))
+
+    @override_settings(PERF_METRICS_IPS=[])
+    def test_restricted_to_staff_and_allowed_addresses(self):
+        response = self.guest_client.get(reverse("perf:metrics"))
+        self.assertEqual(response.status_code, 403)
+        staff = User.objects.create_user(username="staff", is_staff=True)
+        self.guest_client.force_login(staff)
+        self.assertEqual(self.metrics().count("# TYPE"), len(HISTOGRAMS))
+
+    @override_settings(PERF_METRICS=False)
+    def test_can_be_switched_off(self):
+        self.guest_client.get(reverse("index"))
+        self.assertNotIn('view="index"', self.metrics())
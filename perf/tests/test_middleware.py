@@ -0,0 +1,68 @@
+import json
+import re
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from perf.timing import current
+from posts.models import Post, User
+
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(?P<queries>\d+) queries", '
+    r'tpl;dur=(?P<tpl>[\d.]+), '
+    r'cache;dur=[\d.]+;desc="hits=(?P<hits>\d+) misses=(?P<misses>\d+)", '
+    r'total;dur=(?P<total>[\d.]+)'
+)
+
+
+class ServerTimingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        Post.objects.create(text="Тестовый пост", author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def timing(self, url):
+        response = self.guest_client.get(url)
+        match = SERVER_TIMING.fullmatch(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        return match
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_off_by_default(self):
+        response = self.guest_client.get(reverse("index"))
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    @override_settings(PERF_SAMPLE_RATE=1)
+    def test_header_and_log_line(self):
+        profile = reverse("profile", kwargs={"username": "testuser"})
+        with self.assertLogs("perf", "INFO") as logs:
+            match = self.timing(profile)
+        self.assertGreater(int(match["queries"]), 0)
+        self.assertGreater(float(match["tpl"]), 0)
+        self.assertGreaterEqual(float(match["total"]), float(match["tpl"]))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["url_name"], "profile")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["queries"], int(match["queries"]))
+        self.assertIsNone(current.get())
+
+    @override_settings(PERF_SAMPLE_RATE=1)
+    def test_cache_hits_and_misses(self):
+        with self.assertLogs("perf", "INFO"):
+            first = self.timing(reverse("index"))
+            second = self.timing(reverse("index"))
+        self.assertGreater(int(first["misses"]), 0)
+        self.assertGreater(int(second["hits"]), int(first["hits"]))
+
+    @override_settings(PERF_SAMPLE_RATE=1)
+    def test_not_found_is_labelled(self):
+        with self.assertLogs("perf", "INFO") as logs:
+            self.guest_client.get("/a/b/c/d/")
+        self.assertEqual(
+            json.loads(logs.records[0].getMessage())["url_name"], "unknown"
+        )
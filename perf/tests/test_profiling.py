@@ -0,0 +1,100 @@
+import threading
+import time
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from perf.models import Profile
+from perf.profiling import Sampler
+from posts.models import Post, User
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class SamplerTest(TestCase):
+    def test_folded_stacks(self):
+        sampler = Sampler(threading.get_ident(), 0.001, 10000)
+        sampler.start()
+        busy_loop(0.05)
+        sampler.stop()
+        self.assertGreater(sampler.samples, 0)
+        lines = sampler.folded().splitlines()
+        self.assertTrue(any("busy_loop (test_profiling.py" in line
+                            for line in lines))
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+            self.assertIn(";", stack)
+
+    def test_sample_cap(self):
+        sampler = Sampler(threading.get_ident(), 0.0005, 3)
+        sampler.start()
+        busy_loop(0.05)
+        sampler.stop()
+        self.assertEqual(sampler.samples, 3)
+
+
+class ProfilerMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+        cls.user = User.objects.create_user(username="testuser")
+        Post.objects.create(text="Тестовый пост", author=cls.user)
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_staff_profiles_with_header_or_flag(self):
+        response = self.staff_client.get(reverse("index"), HTTP_X_PROFILE="1")
+        profile = Profile.objects.get(pk=response["X-Profile-Id"])
+        self.assertEqual(profile.url_name, "index")
+        self.assertEqual(profile.user, self.staff)
+        self.assertEqual(profile.status, 200)
+        response = self.staff_client.get(reverse("index"), {"_profile": 1})
+        self.assertTrue(response.has_header("X-Profile-Id"))
+        self.assertEqual(Profile.objects.count(), 2)
+
+    def test_others_are_not_profiled(self):
+        client = Client()
+        client.force_login(self.user)
+        for client in (Client(), client):
+            response = client.get(reverse("index"), HTTP_X_PROFILE="1")
+            self.assertFalse(response.has_header("X-Profile-Id"))
+        response = self.staff_client.get(reverse("index"))
+        self.assertFalse(response.has_header("X-Profile-Id"))
+        self.assertFalse(Profile.objects.exists())
+
+    @override_settings(PERF_PROFILE_KEEP=2)
+    def test_only_latest_profiles_are_kept(self):
+        ids = [
+            self.staff_client.get(
+                reverse("index"), HTTP_X_PROFILE="1"
+            )["X-Profile-Id"]
+            for _ in range(4)
+        ]
+        self.assertEqual(
+            sorted(Profile.objects.values_list("pk", flat=True)),
+            sorted(int(pk) for pk in ids[2:])
+        )
+
+    def test_admin_download(self):
+        profile = Profile.objects.create(
+            method="GET", path="/", url_name="index", status=200,
+            duration_ms=12.5, samples=3, folded="a;b 2\na;c 1\n"
+        )
+        changelist = self.staff_client.get(
+            reverse("admin:perf_profile_changelist")
+        )
+        url = reverse("admin:perf_profile_download", args=(profile.pk,))
+        self.assertContains(changelist, url)
+        response = self.staff_client.get(url)
+        self.assertEqual(response.content, b"a;b 2\na;c 1\n")
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertEqual(Client().get(url).status_code, 302)
@@ -0,0 +1,54 @@
+import contextvars
+import time
+
+# Timings of the request being measured; None when it is not sampled, so
+# every probe costs one context variable lookup.
+current = contextvars.ContextVar("perf_timings", default=None)
+
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.db = 0.0
+        self.queries = 0
+        self.templates = 0.0
+        self.template_depth = 0
+        self.cache = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def header(self):
+        return ", ".join((
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f"tpl;dur={self.templates * 1000:.1f}",
+            f'cache;dur={self.cache * 1000:.1f};'
+            f'desc="hits={self.cache_hits} misses={self.cache_misses}"',
+            f"total;dur={self.total * 1000:.1f}",
+        ))
+
+    def as_dict(self):
+        return {
+            "total_ms": round(self.total * 1000, 2),
+            "db_ms": round(self.db * 1000, 2),
+            "queries": self.queries,
+            "template_ms": round(self.templates * 1000, 2),
+            "cache_ms": round(self.cache * 1000, 2),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+def record_query(execute, sql, params, many, context):
+    timings = current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+
+from . import metrics
+
+
+def metrics_view(request):
+    allowed = (
+        request.META.get("REMOTE_ADDR") in settings.PERF_METRICS_IPS
+        or request.user.is_staff
+    )
+    if not allowed:
+        raise PermissionDenied
+    return HttpResponse(
+        metrics.render(metrics.registry.collect()),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,22 +1,81 @@
+from django.conf import settings
 from django.contrib import admin
 
-from .models import Group, Post
+from . import search
+from .changelist import CursorChangeList, EstimatedCountPaginator
+from .models import Follow, Group, Post
 
 
-class PostAdmin(admin.ModelAdmin):
-    list_display = ("pk", "text", "pub_date", "author")
+class ScaleModeAdmin(admin.ModelAdmin):
+    """Changelist tuned for large tables when POSTS_ADMIN_SCALE_MODE is on:
+    estimated counts, no full result count and cursor navigation."""
+
+    cursor_field = None
+
+    @property
+    def show_full_result_count(self):
+        return not settings.POSTS_ADMIN_SCALE_MODE
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        if settings.POSTS_ADMIN_SCALE_MODE:
+            return EstimatedCountPaginator(
+                queryset, per_page, orphans, allow_empty_first_page
+            )
+        return super().get_paginator(
+            request, queryset, per_page, orphans, allow_empty_first_page
+        )
+
+    def get_changelist(self, request, **kwargs):
+        if settings.POSTS_ADMIN_SCALE_MODE:
+            return CursorChangeList
+        return super().get_changelist(request, **kwargs)
+
+
+class PostAdmin(ScaleModeAdmin):
+    list_display = ("pk", "text", "pub_date", "author", "group")
     list_filter = ("pub_date",)
+    list_select_related = ("author", "group")
+    date_hierarchy = "pub_date"
     empty_value_display = "-пусто-"
-    search_fields = ("text", "author")
+    search_fields = ("text", "author__username")
+    cursor_field = "pub_date"
+
+    def get_search_results(self, request, queryset, search_term):
+        query = search.fts_query(search_term)
+        if not query or not search.is_available():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        # A real subquery: RawSQL in id__in becomes a scalar one, one row
+        matches = queryset.extra(
+            where=[f"{Post._meta.db_table}.id IN ({search.MATCH_SQL})"],
+            params=[query]
+        )
+        by_author = queryset.filter(author__username=search_term.strip())
+        return matches | by_author, False
 
 
-class GroupAdmin(admin.ModelAdmin):
+class GroupAdmin(ScaleModeAdmin):
     list_display = ("pk", "title", "slug", "description")
     list_filter = ("title", "slug")
     empty_value_display = "-пусто-"
     search_fields = ("title", "slug", "description")
     prepopulated_fields = {"slug": ("title",)}
 
+    def get_list_filter(self, request):
+        # Filtering by unique columns lists every group in the sidebar
+        if settings.POSTS_ADMIN_SCALE_MODE:
+            return ()
+        return super().get_list_filter(request)
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ("pk", "user", "author")
+    search_fields = ("user__username", "author__username")
+    raw_id_fields = ("user", "author")
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(Follow, FollowAdmin)
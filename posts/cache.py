@@ -0,0 +1,134 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+PAGE_CACHE_PARAMS = ("page", "after", "before")
+
+
+def new_version():
+    return str(time.time_ns())
+
+
+def version_cache():
+    return caches[settings.POSTS_VERSION_CACHE]
+
+
+def get_versions(keys):
+    versions = version_cache().get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        version_cache().set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def bump_versions(keys):
+    version_cache().set_many({key: new_version() for key in keys}, None)
+
+
+def post_version_key(pk):
+    return f"version:post:{pk}"
+
+
+def author_version_key(pk):
+    return f"version:author:{pk}"
+
+
+def group_version_key(pk):
+    return f"version:group:{pk}"
+
+
+def fragment_version_keys(post):
+    keys = [post_version_key(post.pk), author_version_key(post.author_id)]
+    if post.group_id is not None:
+        keys.append(group_version_key(post.group_id))
+    return keys
+
+
+def attach_fragment_versions(posts):
+    # One cache round trip for the whole page instead of one per post
+    posts = list(posts)
+    keys = {key for post in posts for key in fragment_version_keys(post)}
+    versions = get_versions(keys)
+    for post in posts:
+        post.fragment_version = "-".join(
+            versions[key] for key in fragment_version_keys(post)
+        )
+    return posts
+
+
+def fragment_version(post):
+    version = getattr(post, "fragment_version", None)
+    if version is None:
+        version = attach_fragment_versions([post])[0].fragment_version
+    return version
+
+
+def fragment_key(name, post):
+    return f"fragment:{name}:{post.pk}:{fragment_version(post)}"
+
+
+def fragment_cache():
+    return caches[settings.POSTS_FRAGMENT_CACHE]
+
+
+def index_generation_key():
+    return "generation:index"
+
+
+def group_generation_key(slug):
+    return f"generation:group:{slug}"
+
+
+def author_generation_key(username):
+    return f"generation:author:{username}"
+
+
+def feed_generation_keys(post):
+    keys = [
+        index_generation_key(),
+        author_generation_key(post.author.username),
+    ]
+    if post.group_id is not None:
+        keys.append(group_generation_key(post.group.slug))
+    return keys
+
+
+def page_cache_key(request, generations):
+    params = sorted(
+        (name, request.GET[name])
+        for name in PAGE_CACHE_PARAMS if name in request.GET
+    )
+    raw = f"{request.path}|{params}|{sorted(generations.items())}"
+    return "page:" + hashlib.md5(raw.encode()).hexdigest()
+
+
+def anonymous_page_cache(generation_key):
+    """Cache whole responses for logged-out visitors.
+
+    ``generation_key`` maps the view kwargs to the generation key of the
+    feed shown on the page; bumping it retires every cached copy. Pages
+    stay in the cache of each process, generations are read from
+    POSTS_VERSION_CACHE, so a bump in one process retires the copies of
+    all of them only when that cache is shared.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = settings.POSTS_PAGE_CACHE_TIMEOUT
+            if (not timeout or request.method != "GET"
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            generations = get_versions([generation_key(**kwargs)])
+            key = page_cache_key(request, generations)
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    cache.set(key, response, timeout)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,107 @@
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .paginator import InvalidCursor, decode_token, encode_token
+
+CURSOR_VAR = "after"
+
+# Filtered changelists count at most this many rows; deeper pages are
+# reached through cursor navigation.
+COUNT_CAP = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            # Ids are only ever appended, so the largest one is a close
+            # upper estimate that costs a single index lookup.
+            return queryset.aggregate(estimate=Max("pk"))["estimate"] or 0
+        return queryset.order_by()[:COUNT_CAP].count()
+
+
+class CursorChangeList(ChangeList):
+    """Changelist that can continue past the counted pages with ``?after=``.
+
+    Only the default descending ordering is navigated by cursor; the model
+    admin names the column it is sorted by in ``cursor_field`` (``None``
+    for the primary key alone).
+    """
+
+    estimated_count = True
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        super().__init__(request, *args, **kwargs)
+
+    @property
+    def cursor_field(self):
+        return self.model_admin.cursor_field
+
+    @property
+    def cursor_enabled(self):
+        return ORDER_VAR not in self.params
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        remove = list(remove or [])
+        if not new_params or CURSOR_VAR not in new_params:
+            remove.append(CURSOR_VAR)
+        return super().get_query_string(new_params, remove)
+
+    def decode(self, token):
+        value, pk = decode_token(token)
+        if self.cursor_field is None:
+            return None, pk
+        value = parse_datetime(value)
+        if value is None:
+            raise InvalidCursor(token)
+        return value, pk
+
+    def encode(self, obj):
+        value = ""
+        if self.cursor_field is not None:
+            value = getattr(obj, self.cursor_field).isoformat()
+        return encode_token(value, obj.pk)
+
+    def after(self, value, pk):
+        if self.cursor_field is None:
+            return Q(pk__lt=pk)
+        return (
+            Q(**{f"{self.cursor_field}__lt": value})
+            | Q(**{self.cursor_field: value, "pk__lt": pk})
+        )
+
+    def get_results(self, request):
+        super().get_results(request)
+        if not self.cursor or not self.cursor_enabled:
+            return
+        try:
+            value, pk = self.decode(self.cursor)
+        except InvalidCursor:
+            return
+        rows = list(
+            self.queryset.filter(self.after(value, pk))[:self.list_per_page]
+        )
+        self.result_list = rows
+        self.multi_page = True
+
+    @cached_property
+    def next_cursor_url(self):
+        if not self.cursor_enabled:
+            return None
+        rows = list(self.result_list)
+        if len(rows) < self.list_per_page:
+            return None
+        query = self.get_query_string(
+            {CURSOR_VAR: self.encode(rows[-1])}, [PAGE_VAR]
+        )
+        return query
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+
+
+def version_cache_features():
+    return [
+        name for name in ("POSTS_PAGE_CACHE_TIMEOUT", "POSTS_CONDITIONAL_GET")
+        if getattr(settings, name)
+    ]
+
+
+@register()
+def check_version_cache(app_configs, **kwargs):
+    """Features retired through version tokens need the tokens shared by
+    every process."""
+    features = version_cache_features()
+    if not features or not isinstance(
+            caches[settings.POSTS_VERSION_CACHE], LocMemCache):
+        return []
+    return [Error(
+        f"{', '.join(features)} требует общего для всех процессов кэша "
+        "POSTS_VERSION_CACHE, иначе процессы не видят изменений друг друга",
+        hint=(
+            "Укажите в POSTS_VERSION_CACHE кэш на memcached, Redis или в "
+            "базе данных. Сайту из одного процесса можно отключить "
+            "проверку в SILENCED_SYSTEM_CHECKS."
+        ),
+        id="posts.E001",
+    )]
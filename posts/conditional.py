@@ -0,0 +1,117 @@
+import datetime
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+from . import sharding
+from .cache import (PAGE_CACHE_PARAMS, author_generation_key, get_versions,
+                    post_version_key)
+from .models import Post
+
+
+def version_time(version):
+    # Version tokens are the nanosecond timestamps of the last change
+    return datetime.datetime.fromtimestamp(
+        int(version) / 10 ** 9, tz=timezone.utc
+    )
+
+
+def make_etag(request, *parts):
+    viewer = request.user.pk if request.user.is_authenticated else "anon"
+    # Pages embed the CSRF token of the session: a new login must not get
+    # a 304 for a page with the previous one
+    session = request.session.session_key
+    csrf = request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+    params = [
+        request.GET[name] for name in PAGE_CACHE_PARAMS if name in request.GET
+    ]
+    raw = "|".join(
+        str(part) for part in (viewer, session, csrf, *params, *parts)
+    )
+    return '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+def conditional(etag_func, last_modified_func,
+                setting="POSTS_CONDITIONAL_GET"):
+    """``condition`` while the ``setting`` is on.
+
+    Validators are computed before the view runs, so they are dropped
+    from responses other than 200 and 304.
+    """
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=etag_func, last_modified_func=last_modified_func
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, setting):
+                return view(request, *args, **kwargs)
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code not in (200, 304):
+                del response["ETag"]
+                del response["Last-Modified"]
+            patch_vary_headers(response, ("Cookie",))
+            return response
+        return wrapper
+    return decorator
+
+
+def feed_condition(generation_key, setting="POSTS_CONDITIONAL_GET"):
+    """Answer 304 for feeds whose generation has not changed.
+
+    Validators come from the feed generation token and the session, so a
+    matching request costs one cache lookup and never reaches the database
+    or the templates.
+    """
+    def generation(request, **kwargs):
+        key = generation_key(**kwargs)
+        return key, get_versions([key])[key]
+
+    def etag(request, *args, **kwargs):
+        return make_etag(request, request.path, *generation(request, **kwargs))
+
+    def last_modified(request, *args, **kwargs):
+        return version_time(generation(request, **kwargs)[1])
+
+    return conditional(etag, last_modified, setting)
+
+
+def post_state(request, username, post_id):
+    if not hasattr(request, "_post_state"):
+        request._post_state = None
+        row = (
+            sharding.route_username(Post.objects.all(), username)
+            .filter(pk=post_id)
+            .values_list("updated", "author__username")
+            .first()
+        )
+        if row is not None:
+            updated, author = row
+            versions = get_versions([
+                post_version_key(post_id),
+                author_generation_key(author),
+            ])
+            request._post_state = (
+                make_etag(request, post_id, updated.isoformat(),
+                          *sorted(versions.values())),
+                max(updated, *(version_time(v) for v in versions.values()))
+            )
+    return request._post_state
+
+
+def post_etag(request, username, post_id):
+    state = post_state(request, username, post_id)
+    return state and state[0]
+
+
+def post_last_modified(request, username, post_id):
+    state = post_state(request, username, post_id)
+    return state and state[1]
+
+
+post_condition = conditional(post_etag, post_last_modified)
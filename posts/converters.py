@@ -0,0 +1,10 @@
+class SlugListConverter:
+    """Two or more slugs joined with ``+``, as in ``/group/a+b+c/``."""
+
+    regex = r"[-a-zA-Z0-9_]+(?:\+[-a-zA-Z0-9_]+)+"
+
+    def to_python(self, value):
+        return value.split("+")
+
+    def to_url(self, value):
+        return "+".join(value)
@@ -0,0 +1,109 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from . import sharding
+from .models import AuthorCounter, GroupCounter, Post
+
+COUNTERS = (
+    (AuthorCounter, "author"),
+    (GroupCounter, "group"),
+)
+
+
+def bump(model, key, pk, delta):
+    if pk is None:
+        return
+    rows = model.objects.filter(**{f"{key}_id": pk})
+    if delta < 0:
+        rows = rows.filter(posts_count__gte=-delta)
+    updated = rows.update(posts_count=F("posts_count") + delta)
+    if not updated and delta > 0:
+        # Missing row: start it from the exact value, the new post included
+        model.objects.create(
+            **{f"{key}_id": pk},
+            posts_count=sharding.route(
+                Post.objects.filter(**{f"{key}_id": pk})
+            ).count()
+        )
+
+
+def post_created(post):
+    bump(AuthorCounter, "author", post.author_id, 1)
+    bump(GroupCounter, "group", post.group_id, 1)
+
+
+def post_deleted(post):
+    bump(AuthorCounter, "author", post.author_id, -1)
+    bump(GroupCounter, "group", post.group_id, -1)
+
+
+def group_posts_deleted(group_ids):
+    """Count posts deleted without signals; one group id per post."""
+    for group_id, count in Counter(group_ids).items():
+        bump(GroupCounter, "group", group_id, -count)
+
+
+def post_moved(old_group_id, new_group_id):
+    if old_group_id == new_group_id:
+        return
+    bump(GroupCounter, "group", old_group_id, -1)
+    bump(GroupCounter, "group", new_group_id, 1)
+
+
+def author_posts_count(author):
+    try:
+        return author.post_counter.posts_count
+    except AuthorCounter.DoesNotExist:
+        return author.posts.count()
+
+
+def group_posts_count(group):
+    try:
+        return group.post_counter.posts_count
+    except GroupCounter.DoesNotExist:
+        return sharding.route(group.posts.all()).count()
+
+
+def recount(model, key, pks):
+    """Set the counters of ``pks`` to the exact number of their posts."""
+    counts = Counter()
+    for alias in sharding.aliases():
+        counts.update(dict(
+            Post.objects.using(alias)
+            .filter(**{f"{key}_id__in": pks})
+            .order_by()
+            .values_list(f"{key}_id")
+            .annotate(posts_count=Count("id"))
+        ))
+    existing = set(
+        model.objects.filter(**{f"{key}_id__in": pks})
+        .values_list(f"{key}_id", flat=True)
+    )
+    for pk in existing:
+        model.objects.filter(**{f"{key}_id": pk}).update(
+            posts_count=counts.get(pk, 0)
+        )
+    model.objects.bulk_create(
+        model(**{f"{key}_id": pk}, posts_count=counts.get(pk, 0))
+        for pk in pks if pk not in existing
+    )
+
+
+def rebuild(model, key, chunk_size):
+    related = model._meta.get_field(key).related_model
+    last_pk = 0
+    total = 0
+    while True:
+        with transaction.atomic():
+            pks = list(
+                related.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not pks:
+                return total
+            recount(model, key, pks)
+        total += len(pks)
+        last_pk = pks[-1]
@@ -0,0 +1,126 @@
+import bisect
+import datetime
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from . import sharding
+from .importer import keep_dates, refresh_after_bulk_insert
+from .models import Group, Post, User
+
+SCALES = {
+    "10k": 10_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+SEED_BATCH_SIZE = 5000
+
+# Share of posts published outside of any group
+NO_GROUP_SHARE = 0.3
+
+WORDS = (
+    "сегодня вчера город лес море река горы дом работа книга фильм музыка "
+    "друзья семья утро вечер ночь дорога поезд снег дождь солнце весна лето "
+    "осень зима кофе чай прогулка встреча идея проект код сайт новости "
+    "фотография путешествие выходные праздник спорт бег велосипед"
+).split()
+
+
+def zipf_cum_weights(n, exponent):
+    # A few authors and groups produce most of the posts, like on any
+    # real platform.
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, n + 1)
+    ))
+
+
+def pick(rng, ids, cum_weights):
+    point = rng.random() * cum_weights[-1]
+    return ids[bisect.bisect(cum_weights, point)]
+
+
+def make_text(rng):
+    length = max(1, min(400, int(rng.lognormvariate(2.5, 0.9))))
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize()
+
+
+def ensure_users(count):
+    password = make_password(None)
+    usernames = [f"seed_user_{number}" for number in range(count)]
+    for start in range(0, count, SEED_BATCH_SIZE):
+        User.objects.bulk_create(
+            (User(username=name, password=password)
+             for name in usernames[start:start + SEED_BATCH_SIZE]),
+            ignore_conflicts=True
+        )
+    ids = dict(
+        User.objects.filter(username__startswith="seed_user_")
+        .values_list("username", "id")
+    )
+    return usernames, [ids[name] for name in usernames]
+
+
+def ensure_groups(count):
+    slugs = [f"seed-group-{number}" for number in range(count)]
+    Group.objects.bulk_create(
+        (Group(title=f"Группа {number}", slug=slug,
+               description=f"Описание группы {number}")
+         for number, slug in enumerate(slugs)),
+        batch_size=SEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    ids = dict(
+        Group.objects.filter(slug__startswith="seed-group-")
+        .values_list("slug", "id")
+    )
+    return slugs, [ids[slug] for slug in slugs]
+
+
+def generate(posts, authors, groups, years=3, seed=0,
+             batch_size=SEED_BATCH_SIZE, progress=None):
+    """Insert ``posts`` synthetic posts written over the last ``years``.
+
+    Authors and groups are picked with Zipf weights and posts are written
+    in chronological order, so ids grow with ``pub_date`` as they do in
+    production. Memory use does not depend on ``posts``.
+    """
+    rng = random.Random(seed)
+    usernames, author_ids = ensure_users(authors)
+    slugs, group_ids = ensure_groups(groups)
+    author_weights = zipf_cum_weights(authors, 1.1)
+    group_weights = zipf_cum_weights(groups, 0.8)
+    span = datetime.timedelta(days=365 * years)
+    moment = timezone.now() - span
+    mean_gap = span.total_seconds() / max(posts, 1)
+    created = 0
+    with keep_dates():
+        while created < posts:
+            batch = []
+            for _ in range(min(batch_size, posts - created)):
+                moment += datetime.timedelta(
+                    seconds=rng.expovariate(1 / mean_gap)
+                )
+                group_id = None
+                if groups and rng.random() >= NO_GROUP_SHARE:
+                    group_id = pick(rng, group_ids, group_weights)
+                batch.append(Post(
+                    text=make_text(rng),
+                    author_id=pick(rng, author_ids, author_weights),
+                    group_id=group_id,
+                    pub_date=moment,
+                    updated=moment,
+                ))
+            with transaction.atomic():
+                sharding.bulk_create(batch)
+            created += len(batch)
+            if progress is not None:
+                progress(created)
+    refresh_after_bulk_insert(
+        dict(zip(usernames, author_ids)), dict(zip(slugs, group_ids)),
+        batch_size
+    )
+    return created
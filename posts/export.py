@@ -0,0 +1,105 @@
+import csv
+import datetime
+import io
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from . import sharding
+from .feeds import FEED_VALUES
+from .models import Post
+from .paginator import (CURSOR_ORDERING, decode_cursor, encode_cursor,
+                        older_than)
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+EXPORT_CHUNK_SIZE = 1000
+
+# Every record carries the cursor of its own row: resuming an interrupted
+# export is passing the cursor of the last record received as ``after``.
+EXPORT_COLUMNS = tuple(name for name, _ in FEED_VALUES) + ("cursor",)
+
+encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def day_start(date):
+    start = datetime.datetime.combine(date, datetime.time())
+    return timezone.make_aware(start)
+
+
+def export_queryset(group=None, author=None, since=None, until=None):
+    """Posts of a group and/or author published on ``since`` .. ``until``
+    (dates, both inclusive), as plain value rows."""
+    posts = Post.objects.all()
+    if group is not None:
+        posts = posts.filter(group=group)
+    if author is not None:
+        posts = posts.filter(author=author)
+    if since is not None:
+        posts = posts.filter(pub_date__gte=day_start(since))
+    if until is not None:
+        posts = posts.filter(
+            pub_date__lt=day_start(until + datetime.timedelta(days=1))
+        )
+    return sharding.route(
+        posts.order_by(*CURSOR_ORDERING).values_list(
+            *(column for _, column in FEED_VALUES), named=True
+        ),
+        author and author.pk
+    )
+
+
+def iter_rows(posts, after=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Walk ``posts`` newest first in keyset chunks of ``chunk_size`` rows.
+
+    Each chunk is its own indexed range query, so memory stays flat and no
+    cursor is held open between chunks. Raises InvalidCursor for a
+    malformed ``after``.
+    """
+    position = decode_cursor(after) if after else None
+    while True:
+        chunk = posts
+        if position is not None:
+            chunk = chunk.filter(older_than(*position))
+        rows = list(chunk[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        position = rows[-1].pub_date, rows[-1].id
+
+
+def record(row):
+    item = {name: value for (name, _), value in zip(FEED_VALUES, row)}
+    item["cursor"] = encode_cursor(row)
+    return item
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield encoder.encode(record(row)) + "\n"
+
+
+def csv_lines(rows, header=True):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    if header:
+        writer.writeheader()
+        yield flush()
+    for row in rows:
+        item = record(row)
+        item["pub_date"] = item["pub_date"].isoformat()
+        writer.writerow(item)
+        yield flush()
+
+
+def export_lines(rows, export_format, header=True):
+    if export_format == "csv":
+        return csv_lines(rows, header)
+    return ndjson_lines(rows)
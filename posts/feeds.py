@@ -0,0 +1,66 @@
+from . import sharding
+from .merge import MergedQuerySet
+from .models import Post
+
+# What API consumers get for a post: output name and the column it is read
+# from, without instantiating models.
+FEED_VALUES = (
+    ("id", "id"),
+    ("text", "text"),
+    ("pub_date", "pub_date"),
+    ("author", "author__username"),
+    ("group", "group__slug"),
+)
+
+# Everything feed templates touch: the post itself, the author's name and
+# profile link and the group link.
+FEED_FIELDS = (
+    "text",
+    "pub_date",
+    "author__username",
+    "author__first_name",
+    "author__last_name",
+    "group__title",
+    "group__slug",
+)
+
+
+class FeedQuery:
+    def __init__(self, **filters):
+        self.filters = filters
+
+    @classmethod
+    def index(cls):
+        return cls()
+
+    @classmethod
+    def for_group(cls, group):
+        return cls(group=group)
+
+    @classmethod
+    def for_author(cls, author):
+        return cls(author=author)
+
+    def route(self, posts):
+        author = self.filters.get("author")
+        return sharding.route(posts, author and author.pk)
+
+    def queryset(self):
+        return self.route(
+            Post.objects.filter(**self.filters)
+            .select_related("author", "group")
+            .only(*FEED_FIELDS)
+        )
+
+    def values_list(self):
+        return self.route(Post.objects.filter(**self.filters).values_list(
+            *(column for _, column in FEED_VALUES), named=True
+        ))
+
+
+def merged_group_feed(groups):
+    """One newest-first feed of several groups, merged from the indexed
+    feed of each group."""
+    return MergedQuerySet([
+        FeedQuery.for_group(group).queryset() for group in groups
+    ])
@@ -0,0 +1,175 @@
+import json
+from contextlib import contextmanager
+from itertools import islice
+
+from django.db import transaction
+from django.forms import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters, sharding
+from .cache import (author_generation_key, bump_versions,
+                    group_generation_key, index_generation_key)
+from .forms import PostForm
+from .models import Group, Post, User
+
+IMPORT_BATCH_SIZE = 1000
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+@contextmanager
+def keep_dates():
+    # bulk_create runs pre_save on every field, which would stamp auto_now
+    # and auto_now_add columns with the time of the load.
+    fields = [
+        field for field in Post._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def refresh_after_bulk_insert(authors, groups, chunk_size):
+    """Bring the counters and feed generations of the loaded authors and
+    groups up to date; ``authors`` and ``groups`` map names to ids.
+
+    Bulk inserts bypass the post_save handlers, so this runs once for the
+    whole load and recounts only the authors and groups it touched.
+    """
+    for (model, key), pks in zip(
+            counters.COUNTERS, (list(authors.values()), list(groups.values()))
+    ):
+        for start in range(0, len(pks), chunk_size):
+            with transaction.atomic():
+                counters.recount(model, key, pks[start:start + chunk_size])
+    bump_versions(
+        [index_generation_key()]
+        + [author_generation_key(name) for name in authors]
+        + [group_generation_key(slug) for slug in groups]
+    )
+
+
+def names(records, key):
+    return (
+        record[key] for record in records
+        if isinstance(record.get(key), str)
+    )
+
+
+class PostImporter:
+    """Loads posts from NDJSON records in ``bulk_create`` batches.
+
+    Records use the export format: ``text``, ``author`` (username) and
+    optionally ``group`` (slug) and ``pub_date``. Authors and groups are
+    looked up once per distinct name and kept in memory. Invalid records
+    are skipped and listed in ``errors`` with their line numbers.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.authors = {}
+        self.groups = {}
+        self.text_field = PostForm.base_fields["text"]
+        self.imported = 0
+        self.errors = []
+
+    def resolve(self, records):
+        # Unknown names are remembered as None, so they are not looked up
+        # again in the following batches.
+        usernames = set(names(records, "author")) - set(self.authors)
+        slugs = set(names(records, "group")) - set(self.groups)
+        self.authors.update(dict.fromkeys(usernames))
+        self.authors.update(
+            User.objects.filter(username__in=usernames)
+            .values_list("username", "id")
+        )
+        self.groups.update(dict.fromkeys(slugs))
+        self.groups.update(
+            Group.objects.filter(slug__in=slugs).values_list("slug", "id")
+        )
+
+    def build(self, record):
+        author = record.get("author")
+        if not isinstance(author, str) or self.authors.get(author) is None:
+            raise InvalidRecord(f"нет автора {author!r}")
+        group = record.get("group")
+        if group is not None and (
+                not isinstance(group, str) or self.groups.get(group) is None):
+            raise InvalidRecord(f"нет группы {group!r}")
+        try:
+            text = self.text_field.clean(record.get("text"))
+        except ValidationError as error:
+            raise InvalidRecord("текст: " + " ".join(error.messages))
+        pub_date = timezone.now()
+        if record.get("pub_date"):
+            try:
+                pub_date = parse_datetime(record["pub_date"])
+            except (TypeError, ValueError):
+                pub_date = None
+            if pub_date is None:
+                raise InvalidRecord(f"дата {record['pub_date']!r}")
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+        return Post(
+            text=text,
+            author_id=self.authors[author],
+            group_id=self.groups.get(group),
+            pub_date=pub_date,
+            updated=pub_date,
+        )
+
+    def parse(self, lines):
+        for number, line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("ожидается объект")
+            except ValueError as error:
+                self.errors.append((number, f"JSON: {error}"))
+                continue
+            yield number, record
+
+    def load(self, lines):
+        records = self.parse(enumerate(lines, 1))
+        with keep_dates():
+            while True:
+                batch = list(islice(records, self.batch_size))
+                if not batch:
+                    break
+                self.load_batch(batch)
+        self.finish()
+        return self.imported
+
+    def load_batch(self, batch):
+        self.resolve([record for _, record in batch])
+        posts = []
+        for number, record in batch:
+            try:
+                posts.append(self.build(record))
+            except InvalidRecord as error:
+                self.errors.append((number, str(error)))
+        with transaction.atomic():
+            sharding.bulk_create(posts, batch_size=self.batch_size)
+        self.imported += len(posts)
+
+    def finish(self):
+        self.errors.sort()
+        if not self.imported:
+            return
+        refresh_after_bulk_insert(
+            {name: pk for name, pk in self.authors.items() if pk is not None},
+            {slug: pk for slug, pk in self.groups.items() if pk is not None},
+            self.batch_size
+        )
@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from yatube.benchmark import compare, run
+
+
+class Command(BaseCommand):
+    help = "Измеряет время ответа, число запросов и размер каждой страницы"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=20)
+        parser.add_argument(
+            "--cold", action="store_true",
+            help="очищать кэши перед каждым запросом"
+        )
+        parser.add_argument("--output", help="файл для результатов в JSON")
+        parser.add_argument(
+            "--compare", help="JSON прошлого прогона для сравнения"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = run(options["runs"], options["cold"])
+        except ValueError as error:
+            raise CommandError(error)
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as previous:
+                report["comparison"] = list(
+                    compare(json.load(previous), report)
+                )
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(data)
+        else:
+            self.stdout.write(data)
+        for result in report["results"]:
+            self.stderr.write(
+                "{url_name:<20} {viewer:<7} {status} "
+                "{latency_ms[p50]:8.2f} ms {queries:3} queries "
+                "{bytes:8} bytes".format(**result)
+            )
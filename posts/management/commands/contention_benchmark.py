@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from yatube.contention import PROFILES, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет чтение ленты при одновременной записи для стандартного "
+        "и настроенного бэкенда SQLite"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=10)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument(
+            "--profile", action="append", choices=PROFILES,
+            help="профиль бэкенда, по умолчанию все"
+        )
+        parser.add_argument("--output", help="файл для результатов в JSON")
+
+    def handle(self, *args, **options):
+        try:
+            report = run(
+                options["seconds"], options["readers"], options["writers"],
+                options["profile"] or tuple(PROFILES)
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(data)
+        else:
+            self.stdout.write(data)
+        for result in report["results"]:
+            for kind in ("reads", "writes"):
+                stats = result[kind]
+                latency = stats.get("latency_ms", {})
+                self.stderr.write(
+                    f"{result['profile']:<6} {kind:<6} "
+                    f"{stats['per_second']:9.1f}/с "
+                    f"p95 {latency.get('p95', 0):8.2f} ms "
+                    f"max {latency.get('max', 0):8.2f} ms "
+                    f"ошибок {stats['errors']}"
+                )
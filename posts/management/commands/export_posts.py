@@ -0,0 +1,67 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import (EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_lines,
+                          export_queryset, iter_rows)
+from posts.models import Group, User
+from posts.paginator import InvalidCursor, decode_cursor
+
+
+def date(value):
+    return datetime.date.fromisoformat(value)
+
+
+class Command(BaseCommand):
+    help = "Выгружает записи группы, автора или за период в NDJSON или CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--group", help="slug группы")
+        parser.add_argument("--author", help="имя пользователя автора")
+        parser.add_argument("--since", type=date, help="с даты, ГГГГ-ММ-ДД")
+        parser.add_argument("--until", type=date, help="по дату, ГГГГ-ММ-ДД")
+        parser.add_argument(
+            "--format", choices=EXPORT_FORMATS, default="ndjson"
+        )
+        parser.add_argument(
+            "--after", help="курсор последней выгруженной записи"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=EXPORT_CHUNK_SIZE
+        )
+        parser.add_argument(
+            "--output",
+            help="файл вместо stdout; с --after выгрузка дописывается в него"
+        )
+
+    def handle(self, *args, **options):
+        filters = {"since": options["since"], "until": options["until"]}
+        try:
+            if options["group"]:
+                filters["group"] = Group.objects.get(slug=options["group"])
+            if options["author"]:
+                filters["author"] = User.objects.get(
+                    username=options["author"]
+                )
+            if options["after"]:
+                decode_cursor(options["after"])
+        except Group.DoesNotExist:
+            raise CommandError(f"Нет группы {options['group']}")
+        except User.DoesNotExist:
+            raise CommandError(f"Нет пользователя {options['author']}")
+        except InvalidCursor:
+            raise CommandError("Неверный курсор")
+        rows = iter_rows(
+            export_queryset(**filters),
+            after=options["after"],
+            chunk_size=options["chunk_size"]
+        )
+        if not options["output"]:
+            for line in export_lines(rows, options["format"]):
+                self.stdout.write(line, ending="")
+            return
+        resume = bool(options["after"])
+        lines = export_lines(rows, options["format"], header=not resume)
+        with open(options["output"], "a" if resume else "w",
+                  encoding="utf-8", newline="") as output:
+            output.writelines(lines)
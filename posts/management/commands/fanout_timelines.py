@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.timeline import process_pending
+
+
+class Command(BaseCommand):
+    help = "Раскладывает новые записи по лентам подписчиков их авторов"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int,
+            default=settings.POSTS_TIMELINE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--interval", type=float,
+            help="повторять каждые столько секунд"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            written = process_pending(options["batch_size"])
+            if written or not options["interval"]:
+                self.stdout.write(f"Записей в лентах: {written}")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,29 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.importer import IMPORT_BATCH_SIZE, PostImporter
+
+
+class Command(BaseCommand):
+    help = "Загружает записи из NDJSON пакетами через bulk_create"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="файл NDJSON или - для stdin")
+        parser.add_argument(
+            "--batch-size", type=int, default=IMPORT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        importer = PostImporter(options["batch_size"])
+        if options["path"] == "-":
+            importer.load(sys.stdin)
+        else:
+            with open(options["path"], encoding="utf-8") as lines:
+                importer.load(lines)
+        for number, message in importer.errors:
+            self.stderr.write(f"строка {number}: {message}")
+        self.stdout.write(
+            f"Загружено: {importer.imported}, "
+            f"пропущено: {len(importer.errors)}"
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.rebalance import REBALANCE_CHUNK_SIZE, IdConflict, rebalance
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит записи в шарды их авторов после изменения POSTS_SHARDS "
+        "или в основную базу, если шардинг выключен"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=REBALANCE_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        def progress(author_id, source, target, moved):
+            self.stdout.write(
+                f"автор {author_id}: {source} → {target}, {moved}"
+            )
+
+        try:
+            total = rebalance(options["chunk_size"], progress)
+        except IdConflict as error:
+            raise CommandError(error)
+        self.stdout.write(f"Перенесено записей: {total}")
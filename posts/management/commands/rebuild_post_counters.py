@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает счётчики записей авторов и групп"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model, key in counters.COUNTERS:
+            total = counters.rebuild(model, key, options["chunk_size"])
+            self.stdout.write(f"{model.__name__}: {total}")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = "Перестраивает полнотекстовый индекс записей"
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError(
+                "Полнотекстовый индекс доступен только в SQLite"
+            )
+        search.rebuild_index()
+        self.stdout.write("Индекс перестроен")
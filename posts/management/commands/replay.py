@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import User
+from yatube.loadtest import from_log, generated_mix, replay
+
+
+class Command(BaseCommand):
+    help = (
+        "Воспроизводит журнал доступа или сгенерированную смесь запросов "
+        "на WSGI-приложении"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("log", nargs="?", help="журнал доступа")
+        parser.add_argument(
+            "--mix", type=int, help="сгенерировать столько запросов"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--mode", choices=("thread", "process"), default="thread"
+        )
+        parser.add_argument("--output", help="файл для результатов в JSON")
+
+    def handle(self, *args, **options):
+        if options["log"]:
+            default_user = (
+                User.objects.order_by("-post_counter__posts_count")
+                .values_list("username", flat=True).first()
+            )
+            with open(options["log"], encoding="utf-8") as lines:
+                requests = list(from_log(lines, default_user))
+        elif options["mix"]:
+            try:
+                requests = list(generated_mix(options["mix"], options["seed"]))
+            except ValueError as error:
+                raise CommandError(error)
+        else:
+            raise CommandError("Укажите журнал или --mix")
+        report = replay(requests, options["workers"], options["mode"])
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(data)
+        else:
+            self.stdout.write(data)
+        self.stderr.write(
+            f"{report['requests']} запросов за {report['seconds']:.2f} с, "
+            f"{report['throughput']:.1f} в секунду"
+        )
+        for name, stats in report["by_name"].items():
+            self.stderr.write(
+                "{name:<20} {count:6} p50 {p50:8.2f} p95 {p95:8.2f} "
+                "p99 {p99:8.2f} ms, ошибок {error_rate:.1%}".format(
+                    name=name, **stats, **stats["latency_ms"]
+                )
+            )
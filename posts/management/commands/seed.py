@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.dataset import SCALES, SEED_BATCH_SIZE, generate
+
+
+class Command(BaseCommand):
+    help = "Заполняет базу синтетическими авторами, группами и записями"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES)
+        parser.add_argument("--posts", type=int)
+        parser.add_argument(
+            "--authors", type=int,
+            help="по умолчанию одна сотая от числа записей"
+        )
+        parser.add_argument(
+            "--groups", type=int,
+            help="по умолчанию одна двухтысячная от числа записей"
+        )
+        parser.add_argument("--years", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--batch-size", type=int, default=SEED_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        posts = options["posts"]
+        if posts is None and options["scale"]:
+            posts = SCALES[options["scale"]]
+        if not posts:
+            raise CommandError("Укажите --scale или --posts")
+        authors = options["authors"] or max(10, posts // 100)
+        groups = options["groups"] or max(5, posts // 2000)
+
+        def progress(created):
+            self.stdout.write(f"{created}/{posts}")
+
+        generate(
+            posts, authors, groups,
+            years=options["years"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            progress=progress if options["verbosity"] > 1 else None
+        )
+        self.stdout.write(
+            f"Записей: {posts}, авторов: {authors}, групп: {groups}"
+        )
@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from yatube.replicas import sync_replica
+
+
+class Command(BaseCommand):
+    help = "Копирует основную базу SQLite в файлы реплик"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=float,
+            help="повторять каждые столько секунд"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                started = time.perf_counter()
+                sync_replica(alias)
+                self.stdout.write(
+                    f"{alias}: {time.perf_counter() - started:.3f} с"
+                )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from yatube.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = "Прогревает шаблоны, URL и валидаторы паролей"
+
+    def handle(self, *args, **options):
+        report = warm_up()
+        for name, result in report.items():
+            self.stdout.write(
+                f"{name}: {result['items']} за {result['seconds']:.3f} с"
+            )
@@ -0,0 +1,99 @@
+import heapq
+from itertools import islice
+
+
+def chunks(queryset, stop, size):
+    """The first ``stop`` rows of ``queryset``, read ``size`` rows first
+    and twice as many every next time."""
+    offset = 0
+    while offset < stop:
+        limit = min(offset + size, stop)
+        rows = list(queryset[offset:limit])
+        yield from rows
+        if len(rows) < limit - offset:
+            return
+        offset = limit
+        size *= 2
+
+
+class MergedQuerySet:
+    """Querysets of the same shape and ordering, read as one.
+
+    Supports what the feeds and paginators use: filtering, ordering,
+    counting and slicing. The streams are merged with ``heapq.merge``.
+    For a slice ``[a:b]`` every queryset is read lazily, starting with its
+    even share of ``b`` rows, so the rows read stay close to ``b`` however
+    many querysets there are, and a queryset that holds most of the slice
+    costs a few more queries rather than a large read from every other.
+    """
+
+    ordered = True
+
+    def __init__(self, querysets):
+        # Merging is associative: nested merges are flattened
+        self.querysets = []
+        for queryset in querysets:
+            if isinstance(queryset, MergedQuerySet):
+                self.querysets.extend(queryset.querysets)
+            else:
+                self.querysets.append(queryset)
+
+    def _clone(self, method, *args, **kwargs):
+        return MergedQuerySet([
+            getattr(queryset, method)(*args, **kwargs)
+            for queryset in self.querysets
+        ])
+
+    def filter(self, *args, **kwargs):
+        return self._clone("filter", *args, **kwargs)
+
+    def order_by(self, *fields):
+        return self._clone("order_by", *fields)
+
+    def reverse(self):
+        return self._clone("reverse")
+
+    def none(self):
+        return self._clone("none")
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def in_bulk(self, id_list):
+        found = {}
+        for queryset in self.querysets:
+            found.update(queryset.in_bulk(id_list))
+        return found
+
+    def merge_key(self):
+        query = self.querysets[0].query
+        fields = query.order_by or self.querysets[0].model._meta.ordering
+        names = tuple(
+            "id" if name.lstrip("-") == "pk" else name.lstrip("-")
+            for name in fields
+        )
+        descending = fields[0].startswith("-") == query.standard_ordering
+
+        def key(row):
+            return tuple(getattr(row, name) for name in names)
+
+        return key, descending
+
+    def merge(self, streams):
+        key, descending = self.merge_key()
+        return heapq.merge(*streams, key=key, reverse=descending)
+
+    def __iter__(self):
+        return self.merge(queryset.iterator() for queryset in self.querysets)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start = item.start or 0
+        if item.stop is None:
+            return list(islice(self, start, None))
+        size = item.stop // len(self.querysets) + 1
+        rows = self.merge(
+            chunks(queryset, item.stop, size) for queryset in self.querysets
+        )
+        return list(islice(rows, start, item.stop))
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.6 on 2026-10-18 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        # Existing posts were last changed when they were published
+        migrations.RunSQL(
+            'UPDATE "posts_post" SET "updated" = "pub_date"',
+            migrations.RunSQL.noop,
+        ),
+    ]
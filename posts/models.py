@@ -1,5 +1,5 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, router, transaction
 
 User = get_user_model()
 
@@ -13,6 +13,16 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def create(self, **kwargs):
+        # Unless using() was called the router picks the database from the
+        # new post itself, as it does for save()
+        post = self.model(**kwargs)
+        self._for_write = True
+        post.save(force_insert=True, using=self._db)
+        return post
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name="Текст сообщения",
@@ -22,6 +32,10 @@ class Post(models.Model):
         "Дата публикации",
         auto_now_add=True
     )
+    updated = models.DateTimeField(
+        "Дата изменения",
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -37,9 +51,171 @@ class Post(models.Model):
         help_text="Выберите группу"
     )
 
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
         short_text = self.text[:50]
         return f"{self.pub_date} {self.author} {self.group} {short_text}"
 
+    def save(self, *args, **kwargs):
+        # post_save handlers update the counters in the same transaction
+        using = kwargs.get("using") or router.db_for_write(
+            Post, instance=self
+        )
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    class Meta:
+        ordering = ("-pub_date", "-id")
+        indexes = (
+            models.Index(
+                fields=("group", "-pub_date", "-id"),
+                name="post_group_feed_idx"
+            ),
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                name="post_author_feed_idx"
+            ),
+            models.Index(
+                fields=("-pub_date", "-id"),
+                name="post_feed_idx"
+            ),
+        )
+
+
+class AuthorCounter(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="post_counter"
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.author} {self.posts_count}"
+
+
+class GroupCounter(models.Model):
+    # Deleting a group drops its counter row together with the group, which
+    # covers the SET_NULL of its posts without touching them one by one.
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="post_counter"
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.group} {self.posts_count}"
+
+
+class PostTicket(models.Model):
+    # Issues post ids while posts are sharded, see posts.sharding. Only the
+    # row of the last issued id is kept.
+    def __str__(self):
+        return str(self.pk)
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="follower"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="following"
+    )
+
+    def __str__(self):
+        return f"{self.user} → {self.author}"
+
     class Meta:
-        ordering = ("-pub_date",)
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "author"), name="unique_follow"
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F("author")),
+                name="no_self_follow"
+            ),
+        )
+        indexes = (
+            # Followers of an author in batches, see posts.timeline
+            models.Index(
+                fields=("author", "user"), name="follow_followers_idx"
+            ),
+        )
+
+
+class FollowCounter(models.Model):
+    # Created by the first follow of either side; no row means no follows
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="follow_counter"
+    )
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user} {self.followers_count} {self.following_count}"
+
+
+class TimelineEntry(models.Model):
+    """A post in the follow feed of ``user``.
+
+    Posts are referenced by id only, since they may live on another
+    database (see posts.sharding).
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline"
+    )
+    post_id = models.IntegerField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+    pub_date = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user} {self.post_id}"
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "post_id"), name="unique_timeline_post"
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=("user", "-pub_date", "-post_id"),
+                name="timeline_feed_idx"
+            ),
+            models.Index(fields=("post_id",), name="timeline_post_idx"),
+        )
+
+
+class PendingFanout(models.Model):
+    """A new post still to be copied into the timelines of its author's
+    followers; ``next_follower`` is the id the next batch starts after."""
+
+    post_id = models.IntegerField(unique=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+    pub_date = models.DateTimeField()
+    next_follower = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.post_id} {self.next_follower}"
@@ -0,0 +1,194 @@
+import base64
+import binascii
+import collections.abc
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+CURSOR_ORDERING = ("-pub_date", "-id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_token(value, pk):
+    raw = f"{value}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_token(token):
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, pk = raw.rsplit("|", 1)
+        return value, int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(token)
+
+
+def encode_cursor(post):
+    # ``id`` rather than ``pk``, so value rows of the API work as well
+    return encode_token(post.pub_date.isoformat(), post.id)
+
+
+def decode_cursor(token):
+    pub_date, pk = decode_token(token)
+    try:
+        pub_date = parse_datetime(pub_date)
+    except ValueError:
+        raise InvalidCursor(token)
+    if pub_date is None:
+        raise InvalidCursor(token)
+    return pub_date, pk
+
+
+def older_than(pub_date, pk):
+    return Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+
+
+def newer_than(pub_date, pk):
+    return Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+
+
+class CursorPaginator:
+    """Keyset paginator over ``(pub_date, id)``.
+
+    Every page is a single indexed range scan of ``per_page + 1`` rows, so
+    there is no ``COUNT(*)`` and deep pages cost the same as the first one.
+    """
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list.order_by(*CURSOR_ORDERING)
+        self.per_page = int(per_page)
+
+    def get_page(self, after=None, before=None):
+        try:
+            if before:
+                return self._page_before(*decode_cursor(before))
+            if after:
+                return self._page_after(*decode_cursor(after))
+        except InvalidCursor:
+            pass
+        return self._page_after(None, None)
+
+    def _page_after(self, pub_date, pk):
+        posts = self.object_list
+        if pub_date is not None:
+            posts = posts.filter(older_than(pub_date, pk))
+        rows = list(posts[:self.per_page + 1])
+        return CursorPage(
+            rows[:self.per_page],
+            self,
+            has_next=len(rows) > self.per_page,
+            has_previous=pub_date is not None,
+        )
+
+    def _page_before(self, pub_date, pk):
+        posts = self.object_list.filter(
+            newer_than(pub_date, pk)
+        ).reverse()
+        rows = list(posts[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return CursorPage(
+            rows,
+            self,
+            has_next=True,
+            has_previous=has_previous,
+        )
+
+
+class CursorPage(collections.abc.Sequence):
+    cursor_mode = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous,
+                 make_cursor=encode_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self._make_cursor = make_cursor
+
+    def __repr__(self):
+        return f"<Cursor page of {len(self.object_list)} items>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return self._make_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return self._make_cursor(self.object_list[0])
+
+
+class UncountedPaginator(Paginator):
+    """Numbered pages without ``COUNT(*)``: each page reads one extra row to
+    find out whether there is a next one."""
+
+    count_known = False
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(number)
+        if number < 1:
+            raise EmptyPage(number)
+        return number
+
+    def get_page(self, number):
+        try:
+            number = self.validate_number(number)
+        except (PageNotAnInteger, EmptyPage):
+            number = 1
+        return self.page(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return UncountedPage(
+            rows[:self.per_page],
+            number,
+            self,
+            has_next=len(rows) > self.per_page
+        )
+
+
+class UncountedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return self.paginator.per_page * (self.number - 1) + 1
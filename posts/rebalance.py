@@ -0,0 +1,115 @@
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+
+from . import sharding
+from .importer import keep_dates
+from .models import Post
+
+REBALANCE_CHUNK_SIZE = 1000
+
+
+# Columns a copy left by an interrupted move has in common with its source
+COPY_FIELDS = ("author_id", "group_id", "text", "pub_date")
+
+
+class IdConflict(ValueError):
+    pass
+
+
+def sources():
+    return sharding.databases()
+
+
+def home(author_id):
+    if sharding.enabled():
+        return sharding.shard_for(author_id)
+    return DEFAULT_DB_ALIAS
+
+
+def delete_rows(alias, pks):
+    # Raw, so the counters don't count moved posts as deleted
+    placeholders = ", ".join(["%s"] * len(pks))
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {Post._meta.db_table} WHERE id IN ({placeholders})",
+            pks
+        )
+
+
+def move_posts(author_id, source, target, chunk_size):
+    """Move the posts of one author from ``source`` to ``target``.
+
+    Every chunk is copied before it is deleted, and copies of rows that
+    are already there are skipped, so an interrupted move is finished by
+    running it again. A different post with the same id on ``target``
+    raises ``IdConflict`` before anything of the chunk is deleted.
+    """
+    moved = 0
+    while True:
+        posts = list(
+            Post._base_manager.using(source)
+            .filter(author_id=author_id)
+            .order_by("pk")[:chunk_size]
+        )
+        if not posts:
+            return moved
+        if target != DEFAULT_DB_ALIAS:
+            sharding.copy_references(
+                target,
+                {author_id},
+                {post.group_id for post in posts} - {None}
+            )
+        with keep_dates(), transaction.atomic(using=target):
+            copies = Post._base_manager.using(target).in_bulk(
+                [post.pk for post in posts]
+            )
+            for post in posts:
+                copy = copies.get(post.pk)
+                if copy is not None and any(
+                        getattr(copy, name) != getattr(post, name)
+                        for name in COPY_FIELDS):
+                    raise IdConflict(
+                        f"запись {post.pk} из {source} уже есть в {target} "
+                        "с другим содержимым"
+                    )
+            Post._base_manager.using(target).bulk_create(
+                post for post in posts if post.pk not in copies
+            )
+        with transaction.atomic(using=source):
+            delete_rows(source, [post.pk for post in posts])
+        moved += len(posts)
+
+
+def rebalance(chunk_size=REBALANCE_CHUNK_SIZE, progress=None):
+    """Move every post to the home database of its author: its shard in
+    POSTS_SHARDS, or the primary while sharding is off.
+
+    Returns the number of moved posts. ``progress`` is called with the
+    author id, source, target and count after each author.
+    """
+    total = 0
+    top = 0
+    for source in sources():
+        author_ids = list(
+            Post._base_manager.using(source)
+            .order_by()
+            .values_list("author_id", flat=True)
+            .distinct()
+        )
+        for author_id in author_ids:
+            target = home(author_id)
+            if target == source:
+                continue
+            moved = move_posts(author_id, source, target, chunk_size)
+            total += moved
+            if progress is not None:
+                progress(author_id, source, target, moved)
+        top = max(
+            top,
+            Post._base_manager.using(source).aggregate(top=Max("id"))["top"]
+            or 0
+        )
+    if sharding.enabled() and top:
+        # Posts created before sharding keep their ids
+        sharding.reserve_ids(top)
+    return total
@@ -0,0 +1,145 @@
+import heapq
+import re
+from itertools import islice
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+from . import sharding
+from .feeds import FeedQuery
+from .paginator import CursorPage, InvalidCursor, decode_token, encode_token
+
+FTS_TABLE = "posts_post_fts"
+
+# Kept in sync with posts_post by triggers, so bulk inserts and queryset
+# updates are indexed as well. Statements are idempotent and are reused by
+# the rebuild_search_index command.
+INDEX_SQL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61',
+        prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+        AFTER INSERT ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+        AFTER DELETE ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+        AFTER UPDATE OF text ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+            INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+        END""",
+)
+
+MATCH_SQL = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+
+
+def is_available():
+    return connection.vendor == "sqlite"
+
+
+def fts_query(text):
+    # Every word becomes a quoted prefix term, so user input can never be
+    # parsed as FTS5 syntax.
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text))
+
+
+def ensure_index(alias=DEFAULT_DB_ALIAS):
+    with connections[alias].cursor() as cursor:
+        for sql in INDEX_SQL:
+            cursor.execute(sql)
+
+
+def rebuild_index():
+    for alias in sharding.aliases():
+        ensure_index(alias)
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+            )
+
+
+def encode_rank_cursor(post):
+    return encode_token(repr(post.search_rank), post.pk)
+
+
+def decode_rank_cursor(token):
+    rank, pk = decode_token(token)
+    try:
+        return float(rank), pk
+    except ValueError:
+        raise InvalidCursor(token)
+
+
+class SearchPaginator:
+    """Keyset pagination over FTS5 results ordered by ``(rank, rowid)``.
+
+    Every shard has its own index; their pages are merged by the same key.
+    """
+
+    def __init__(self, query, per_page):
+        self.query = fts_query(query)
+        self.per_page = int(per_page)
+
+    def get_page(self, after=None, before=None):
+        if not self.query:
+            return CursorPage([], self, False, False, encode_rank_cursor)
+        try:
+            if before:
+                return self._page(decode_rank_cursor(before), backwards=True)
+            if after:
+                return self._page(decode_rank_cursor(after))
+        except InvalidCursor:
+            pass
+        return self._page(None)
+
+    def _page(self, cursor, backwards=False):
+        sql = f"SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        params = [self.query]
+        if cursor is not None:
+            op = "<" if backwards else ">"
+            sql += f" AND (rank {op} %s OR (rank = %s AND rowid {op} %s))"
+            params += [cursor[0], cursor[0], cursor[1]]
+        direction = "DESC" if backwards else "ASC"
+        sql += f" ORDER BY rank {direction}, rowid {direction} LIMIT %s"
+        params.append(self.per_page + 1)
+        shard_rows = []
+        for alias in sharding.aliases():
+            with connections[alias].cursor() as db_cursor:
+                db_cursor.execute(sql, params)
+                shard_rows.append(db_cursor.fetchall())
+        rows = list(islice(
+            heapq.merge(
+                *shard_rows,
+                key=lambda row: (row[1], row[0]),
+                reverse=backwards
+            ),
+            self.per_page + 1
+        ))
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        posts = FeedQuery.index().queryset().in_bulk([pk for pk, _ in rows])
+        object_list = []
+        for pk, rank in rows:
+            if pk in posts:
+                posts[pk].search_rank = rank
+                object_list.append(posts[pk])
+        return CursorPage(
+            object_list,
+            self,
+            has_next=True if backwards else has_more,
+            has_previous=has_more if backwards else cursor is not None,
+            make_cursor=encode_rank_cursor,
+        )
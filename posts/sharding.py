@@ -0,0 +1,222 @@
+"""
+Sharding of posts by author.
+
+While POSTS_SHARDS is set, every ``Post`` row lives on one of those
+database aliases, picked by ``author_id``; users, groups, counters and
+everything else stay on the primary. Shards keep copies of the user and
+group rows their posts reference, so feeds are still single joins there.
+
+Feeds of one author read one shard. The index and group feeds merge the
+newest-first streams of every shard. Post ids come from a ticket table on
+the primary, so they stay unique across shards.
+
+After POSTS_SHARDS changes, ``manage.py rebalance_shards`` moves posts to
+the shards of their authors.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import Max
+
+from .merge import MergedQuerySet
+from .models import Group, Post, PostTicket, User
+
+# Shards hold copies of these for the joins of their posts
+REFERENCED_MODELS = (User, Group)
+
+
+def enabled():
+    return bool(settings.POSTS_SHARDS)
+
+
+def shard_for(author_id):
+    return settings.POSTS_SHARDS[author_id % len(settings.POSTS_SHARDS)]
+
+
+def aliases():
+    return list(settings.POSTS_SHARDS) or [DEFAULT_DB_ALIAS]
+
+
+def databases():
+    """Every alias that may hold posts, sharding on or off."""
+    return [DEFAULT_DB_ALIAS] + [
+        alias for alias in settings.POSTS_SHARD_ALIASES
+        if alias != DEFAULT_DB_ALIAS
+    ]
+
+
+def owner_id(instance):
+    if isinstance(instance, Post):
+        return instance.author_id
+    if isinstance(instance, User):
+        return instance.pk
+    return None
+
+
+class ShardRouter:
+    """Sends posts to the shard of their author.
+
+    Rows keep the database they were read from, so a post that has not
+    been moved by rebalancing yet is updated where it is. Reads through a
+    post or user read from a shard go back to the primary for everything
+    but posts.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not enabled():
+            return None
+        instance = hints.get("instance")
+        if model is Post:
+            return self.db_for_write(model, **hints)
+        if (instance is not None
+                and instance._state.db in settings.POSTS_SHARD_ALIASES):
+            return router.db_for_read(model)
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model is not Post or not enabled():
+            return None
+        instance = hints.get("instance")
+        if isinstance(instance, Post) and instance._state.db:
+            return instance._state.db
+        author_id = owner_id(instance)
+        if author_id is None:
+            return None
+        return shard_for(author_id)
+
+
+def top_id():
+    return max(
+        Post._base_manager.using(alias).aggregate(top=Max("id"))["top"] or 0
+        for alias in databases()
+    )
+
+
+def allocate_ids(count):
+    """Reserve ``count`` consecutive post ids.
+
+    The first insert takes the write lock of the primary, so concurrent
+    callers get disjoint ranges. Only the last ticket is kept. The first
+    allocation starts above the posts created before sharding, wherever
+    they are.
+    """
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        if not PostTicket.objects.exists():
+            top = top_id()
+            if top:
+                PostTicket.objects.bulk_create(
+                    [PostTicket(pk=top)], ignore_conflicts=True
+                )
+        first = PostTicket.objects.create().pk
+        last = first + count - 1
+        if last > first:
+            PostTicket.objects.create(pk=last)
+        PostTicket.objects.filter(pk__lt=last).delete()
+    return range(first, last + 1)
+
+
+def reserve_ids(top):
+    """Make sure tickets continue above ``top``."""
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        if not PostTicket.objects.filter(pk__gte=top).exists():
+            PostTicket.objects.create(pk=top)
+        PostTicket.objects.filter(pk__lt=top).delete()
+
+
+def copy_references(alias, author_ids, group_ids):
+    """Copy the users and groups of a batch of posts to shard ``alias``."""
+    for model, pks in zip(REFERENCED_MODELS, (author_ids, group_ids)):
+        rows = model._base_manager.using(alias)
+        missing = set(pks) - set(
+            rows.filter(pk__in=pks).values_list("pk", flat=True)
+        )
+        if missing:
+            rows.bulk_create(
+                model._base_manager.using(DEFAULT_DB_ALIAS)
+                .filter(pk__in=missing)
+            )
+
+
+def replicate(instance):
+    # Plain queries, so no save signals are sent for the copies
+    model = type(instance)
+    values = {
+        field.attname: getattr(instance, field.attname)
+        for field in model._meta.concrete_fields
+    }
+    for alias in settings.POSTS_SHARDS:
+        rows = model._base_manager.using(alias)
+        if not rows.filter(pk=instance.pk).update(**values):
+            rows.bulk_create([model(**values)])
+
+
+def delete_posts(author):
+    """Delete the posts of a deleted ``author`` from the shards.
+
+    Raw, because their delete handlers would look the author up on the
+    primary, where it is gone already. Returns the group ids of the
+    deleted posts, one per post.
+    """
+    group_ids = []
+    for alias in settings.POSTS_SHARDS:
+        posts = Post._base_manager.using(alias).filter(author_id=author.pk)
+        group_ids += posts.exclude(group=None).values_list(
+            "group_id", flat=True
+        )
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Post._meta.db_table} WHERE author_id = %s",
+                [author.pk]
+            )
+    return group_ids
+
+
+def unreplicate(instance):
+    for alias in settings.POSTS_SHARDS:
+        type(instance)._base_manager.using(alias).filter(
+            pk=instance.pk
+        ).delete()
+
+
+def bulk_create(posts, batch_size=None):
+    """``bulk_create`` that gives posts ticket ids and puts every post on
+    the shard of its author."""
+    if not enabled():
+        return Post.objects.bulk_create(posts, batch_size=batch_size)
+    by_alias = defaultdict(list)
+    for post, pk in zip(posts, allocate_ids(len(posts))):
+        post.pk = pk
+        by_alias[shard_for(post.author_id)].append(post)
+    for alias, batch in by_alias.items():
+        copy_references(
+            alias,
+            {post.author_id for post in batch},
+            {post.group_id for post in batch} - {None}
+        )
+        with transaction.atomic(using=alias):
+            Post.objects.using(alias).bulk_create(batch, batch_size=batch_size)
+    return posts
+
+
+def route(posts, author_id=None):
+    """``posts`` on the shard of ``author_id``, or merged from all shards."""
+    if not enabled():
+        return posts
+    if author_id is not None:
+        return posts.using(shard_for(author_id))
+    return MergedQuerySet([posts.using(alias) for alias in aliases()])
+
+
+def route_username(posts, username):
+    if not enabled():
+        return posts
+    author_id = (
+        User.objects.filter(username=username)
+        .values_list("id", flat=True)
+        .first()
+    )
+    if author_id is None:
+        return posts.none()
+    return route(posts, author_id)
@@ -0,0 +1,189 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters, sharding, timeline
+from .cache import (author_generation_key, author_version_key, bump_versions,
+                    feed_generation_keys, group_generation_key,
+                    group_version_key, index_generation_key,
+                    post_version_key)
+from .models import Follow, Group, Post, User
+
+
+def is_login_update(update_fields):
+    return update_fields is not None and set(update_fields) <= {"last_login"}
+
+
+@receiver(pre_save, sender=Post)
+def assign_post_id(sender, instance, raw, **kwargs):
+    if raw or not sharding.enabled():
+        return
+    # Ids of sharded posts come from the tickets on the primary
+    if instance.pk is None:
+        instance.pk = sharding.allocate_ids(1)[0]
+    # Users and groups that existed before sharding have no copies yet
+    alias = router.db_for_write(Post, instance=instance)
+    if alias in settings.POSTS_SHARDS:
+        sharding.copy_references(
+            alias,
+            [instance.author_id],
+            [instance.group_id] if instance.group_id is not None else []
+        )
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_group(sender, instance, raw, update_fields, **kwargs):
+    instance._previous_group_id = instance.group_id
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {"group", "group_id"} & update_fields:
+        return
+    instance._previous_group_id = (
+        Post.objects.using(router.db_for_write(Post, instance=instance))
+        .filter(pk=instance.pk)
+        .values_list("group_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    keys = [post_version_key(instance.pk)] + feed_generation_keys(instance)
+    if created:
+        counters.post_created(instance)
+        timeline.enqueue(instance)
+    else:
+        previous_group_id = instance._previous_group_id
+        counters.post_moved(previous_group_id, instance.group_id)
+        if previous_group_id not in (None, instance.group_id):
+            keys += [
+                group_generation_key(slug) for slug in
+                Group.objects.filter(pk=previous_group_id)
+                .values_list("slug", flat=True)
+            ]
+    bump_versions(keys)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.post_deleted(instance)
+    timeline.forget(instance)
+    bump_versions(
+        [post_version_key(instance.pk)] + feed_generation_keys(instance)
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_username(sender, instance, raw, update_fields,
+                               **kwargs):
+    instance._previous_username = None
+    if raw or instance._state.adding or is_login_update(update_fields):
+        return
+    instance._previous_username = (
+        User.objects.filter(pk=instance.pk)
+        .values_list("username", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, using, **kwargs):
+    if is_login_update(update_fields) or using != DEFAULT_DB_ALIAS:
+        return
+    sharding.replicate(instance)
+    keys = [author_version_key(instance.pk)]
+    if not created:
+        # Author names are shown on every feed the author has posted to
+        usernames = {instance.username, instance._previous_username} - {None}
+        slugs = (
+            Group.objects.using(router.db_for_read(Post, instance=instance))
+            .filter(posts__author=instance)
+            .values_list("slug", flat=True)
+            .distinct()
+        )
+        keys += [author_generation_key(name) for name in usernames]
+        keys += [group_generation_key(slug) for slug in slugs]
+        keys.append(index_generation_key())
+    bump_versions(keys)
+
+
+@receiver(pre_save, sender=Group)
+def remember_previous_slug(sender, instance, raw, **kwargs):
+    instance._previous_slug = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_slug = (
+        Group.objects.filter(pk=instance.pk)
+        .values_list("slug", flat=True)
+        .first()
+    )
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS or not sharding.enabled():
+        return
+    # Posts on the primary went with the user; the counter rows, timeline
+    # entries and queued fan-outs of the author cascade there too.
+    group_ids = sharding.delete_posts(instance)
+    sharding.unreplicate(instance)
+    counters.group_posts_deleted(group_ids)
+    bump_versions(
+        [index_generation_key(), author_generation_key(instance.username)]
+        + [
+            group_generation_key(slug) for slug in
+            Group.objects.filter(pk__in=group_ids)
+            .values_list("slug", flat=True)
+        ]
+    )
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS:
+        return
+    sharding.replicate(instance)
+    slugs = {instance.slug, instance._previous_slug} - {None}
+    bump_versions(
+        [group_version_key(instance.pk), index_generation_key()]
+        + [group_generation_key(slug) for slug in slugs]
+    )
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS:
+        return
+    sharding.unreplicate(instance)
+    bump_versions(
+        [index_generation_key(), group_generation_key(instance.slug)]
+    )
+
+
+def follow_generation_keys(follow):
+    # Both profile cards show the counts
+    return [
+        author_generation_key(follow.user.username),
+        author_generation_key(follow.author.username),
+    ]
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw, **kwargs):
+    if raw or not created:
+        return
+    timeline.bump(instance.user_id, "following_count", 1)
+    timeline.bump(instance.author_id, "followers_count", 1)
+    timeline.backfill(instance)
+    bump_versions(follow_generation_keys(instance))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    timeline.bump(instance.user_id, "following_count", -1)
+    timeline.bump(instance.author_id, "followers_count", -1)
+    timeline.unfollowed(instance)
+    bump_versions(follow_generation_keys(instance))
@@ -0,0 +1,36 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page, size=2):
+    """Page numbers to link: the first and the last page and ``size`` pages
+    around the current one, with ``None`` in place of every gap.
+
+    The result never grows with the number of pages. Cursor pages have no
+    numbers at all, and for paginators that don't count rows the window
+    ends one page past the current one, followed by a gap while there are
+    more pages.
+    """
+    if getattr(page, "cursor_mode", False):
+        return []
+    current = page.number
+    count_known = getattr(page.paginator, "count_known", True)
+    if count_known:
+        last = page.paginator.num_pages
+    else:
+        last = current + 1 if page.has_next() else current
+    numbers = {1, last}
+    first, stop = max(1, current - size), min(last, current + size)
+    numbers.update(range(first, stop + 1))
+    window = []
+    previous = 0
+    for number in sorted(numbers):
+        if number - previous > 1:
+            window.append(None)
+        window.append(number)
+        previous = number
+    if not count_known and page.has_next():
+        window.append(None)
+    return window
@@ -0,0 +1,43 @@
+from django import template
+
+from posts.cache import fragment_cache, fragment_key
+
+register = template.Library()
+
+
+class PostFragmentNode(template.Node):
+    def __init__(self, nodelist, post, name):
+        self.nodelist = nodelist
+        self.post = post
+        self.name = name
+
+    def render(self, context):
+        post = self.post.resolve(context)
+        key = fragment_key(self.name.resolve(context), post)
+        cache = fragment_cache()
+        html = cache.get(key)
+        if html is None:
+            html = self.nodelist.render(context)
+            cache.set(key, html)
+        return html
+
+
+@register.tag
+def post_fragment(parser, token):
+    """Cache a part of a post template until the post, its author or its
+    group changes.
+
+    {% post_fragment post "name" %} ... {% endpost_fragment %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires a post and a fragment name"
+        )
+    nodelist = parser.parse(("endpost_fragment",))
+    parser.delete_first_token()
+    return PostFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2])
+    )
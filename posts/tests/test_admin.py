@@ -0,0 +1,61 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+        cls.user = User.objects.create_user(username="writer")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=cls.user, group=cls.group)
+            for i in range(250)
+        )
+        cls.url = reverse("admin:posts_post_changelist")
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_search_by_author_username(self):
+        response = self.client.get(self.url, {"q": "writer"})
+        self.assertEqual(response.context["cl"].result_count, 250)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        with self.assertNumQueries(7):
+            self.client.get(self.url)
+
+    @override_settings(POSTS_ADMIN_SCALE_MODE=True)
+    def test_scale_mode_skips_exact_counts(self):
+        response = self.client.get(self.url)
+        self.assertIsNone(response.context["cl"].full_result_count)
+        self.assertContains(response, "~250")
+
+    @override_settings(POSTS_ADMIN_SCALE_MODE=True)
+    def test_scale_mode_cursor_navigation(self):
+        expected = list(Post.objects.values_list("pk", flat=True))
+        seen = []
+        response = self.client.get(self.url)
+        while True:
+            cl = response.context["cl"]
+            seen.extend(post.pk for post in cl.result_list)
+            if not cl.next_cursor_url:
+                break
+            response = self.client.get(self.url + cl.next_cursor_url)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(seen, expected)
+
+    @override_settings(POSTS_ADMIN_SCALE_MODE=True)
+    def test_scale_mode_group_changelist(self):
+        response = self.client.get(reverse("admin:posts_group_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["cl"].has_filters)
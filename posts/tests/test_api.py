@@ -0,0 +1,94 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from api.views import API_PER_PAGE
+from posts.models import Group, Post, User
+
+
+class FeedApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=cls.user, group=cls.group)
+            for i in range(API_PER_PAGE + 5)
+        )
+        cls.latest = Post.objects.create(text="Последний", author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_json(self, url, **params):
+        response = self.guest_client.get(url, params)
+        self.assertEqual(response["Content-Type"], "application/json")
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_feeds_match_site_feeds(self):
+        feeds = {
+            reverse("api:index"): Post.objects.all(),
+            reverse("api:group_posts", kwargs={"slug": "test-slug"}):
+                self.group.posts.all(),
+            reverse("api:profile", kwargs={"username": "testuser"}):
+                self.user.posts.all(),
+        }
+        for url, posts in feeds.items():
+            with self.subTest(url=url):
+                ids = [row["id"] for row in self.get_json(url)["results"]]
+                self.assertEqual(
+                    ids, [post.id for post in posts[:API_PER_PAGE]]
+                )
+
+    def test_row_shape(self):
+        row = self.get_json(reverse("api:index"))["results"][0]
+        self.assertEqual(row, {
+            "id": self.latest.id,
+            "text": "Последний",
+            "pub_date": row["pub_date"],
+            "author": "testuser",
+            "group": None,
+        })
+
+    def test_cursor_pages_cover_feed(self):
+        url = reverse("api:index")
+        data = self.get_json(url)
+        self.assertIsNone(data["previous"])
+        ids = [row["id"] for row in data["results"]]
+        while data["next"]:
+            data = self.get_json(data["next"])
+            ids.extend(row["id"] for row in data["results"])
+        self.assertEqual(ids, list(Post.objects.values_list("id", flat=True)))
+        back = self.get_json(data["previous"])
+        self.assertEqual(len(back["results"]), API_PER_PAGE)
+
+    def test_single_query_per_page(self):
+        with self.assertNumQueries(1):
+            self.get_json(reverse("api:index"))
+
+    def test_strong_etag(self):
+        url = reverse("api:index")
+        etag = self.guest_client.get(url)["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(text="Новый", author=self.user)
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        with override_settings(API_CONDITIONAL_GET=False):
+            self.assertFalse(self.guest_client.get(url).has_header("ETag"))
+
+    def test_unknown_feed_and_unsafe_method(self):
+        response = self.guest_client.get(
+            reverse("api:group_posts", kwargs={"slug": "missing"})
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.guest_client.post(reverse("api:index"))
+        self.assertEqual(response.status_code, 405)
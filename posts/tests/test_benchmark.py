@@ -0,0 +1,76 @@
+import io
+import json
+import tempfile
+from collections import Counter
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.dataset import generate
+from posts.models import AuthorCounter, Group, Post, User
+from yatube.benchmark import benchmark_urls, compare, run
+
+
+class SeedTest(TestCase):
+    def test_distribution(self):
+        self.assertEqual(generate(600, authors=30, groups=6, seed=1), 600)
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 6)
+        per_author = Counter(Post.objects.values_list("author", flat=True))
+        counts = sorted(per_author.values(), reverse=True)
+        self.assertGreater(counts[0], 5 * counts[len(counts) // 2])
+        self.assertEqual(
+            sum(AuthorCounter.objects.values_list("posts_count", flat=True)),
+            600
+        )
+        dates = list(Post.objects.order_by("id").values_list(
+            "pub_date", flat=True
+        ))
+        self.assertEqual(dates, sorted(dates))
+        self.assertGreater((dates[-1] - dates[0]).days, 365 * 2)
+        self.assertTrue(Post.objects.filter(group__isnull=True).exists())
+
+    def test_command_is_repeatable(self):
+        call_command("seed", "--posts=50", stdout=io.StringIO())
+        call_command("seed", "--posts=50", stdout=io.StringIO())
+        self.assertEqual(Post.objects.count(), 100)
+        self.assertEqual(User.objects.count(), 10)
+
+
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(100, authors=10, groups=5)
+
+    def test_every_url_is_measured(self):
+        report = run(runs=2)
+        names = {result["url_name"] for result in report["results"]}
+        post = Post.objects.filter(group__isnull=False).first()
+        self.assertEqual(names, {name for name, _ in benchmark_urls(post)})
+        self.assertTrue({
+            "index", "group_posts", "groups_posts", "signup", "about:tech",
+            "post_edit",
+        } <= names)
+        for result in report["results"]:
+            self.assertIn(result["status"], (200, 302))
+            self.assertGreater(result["latency_ms"]["p50"], 0)
+        self.assertEqual(report["environment"]["posts"], 100)
+
+    def test_command_writes_json_and_compares(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as first:
+            call_command(
+                "benchmark", "--runs=1", f"--output={first.name}",
+                stderr=io.StringIO()
+            )
+            out = io.StringIO()
+            call_command(
+                "benchmark", "--runs=1", "--cold", f"--compare={first.name}",
+                stdout=out, stderr=io.StringIO()
+            )
+        report = json.loads(out.getvalue())
+        self.assertEqual(
+            len(report["comparison"]), len(report["results"])
+        )
+        self.assertEqual(
+            len(list(compare(report, report))), len(report["results"])
+        )
@@ -0,0 +1,179 @@
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.cache import post_version_key
+from posts.checks import check_version_cache
+from posts.models import Group, Post, User
+
+
+class PostFragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches["fragments"].clear()
+        self.user = User.objects.create_user(
+            username="testuser", first_name="Имя", last_name="Фамилия"
+        )
+        self.other_user = User.objects.create_user(username="otheruser")
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.other_client = Client()
+        self.other_client.force_login(self.other_user)
+        self.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        self.post = Post.objects.create(
+            text="Исходный текст", author=self.user, group=self.group
+        )
+        self.profile_url = reverse(
+            "profile", kwargs={"username": self.user.username}
+        )
+        self.edit_url = reverse("post_edit", kwargs={
+            "username": self.user.username,
+            "post_id": self.post.id
+        })
+
+    def test_fragments_are_reused_between_renders(self):
+        self.authorized_client.get(self.profile_url)
+        cached = caches["fragments"]._cache.copy()
+        self.assertTrue(cached)
+        self.authorized_client.get(self.profile_url)
+        self.assertEqual(caches["fragments"]._cache.keys(), cached.keys())
+
+    def test_post_edit_invalidates_fragment(self):
+        self.authorized_client.get(self.profile_url)
+        self.authorized_client.post(
+            self.edit_url, data={"text": "Новый текст"}
+        )
+        response = self.authorized_client.get(self.profile_url)
+        self.assertContains(response, "Новый текст")
+        self.assertNotContains(response, "Исходный текст")
+
+    def test_author_and_group_changes_invalidate_fragment(self):
+        self.authorized_client.get(reverse("index"))
+        self.user.first_name = "Другое"
+        self.user.save()
+        self.group.slug = "new-slug"
+        self.group.save()
+        response = self.authorized_client.get(reverse("index"))
+        self.assertContains(response, "Другое Фамилия")
+        self.assertContains(
+            response, reverse("group_posts", kwargs={"slug": "new-slug"})
+        )
+
+    @override_settings(
+        CACHES={
+            **settings.CACHES,
+            "shared": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "shared",
+            },
+        },
+        POSTS_VERSION_CACHE="shared",
+    )
+    def test_versions_are_shared_through_the_version_cache(self):
+        # A second instance of the backend, as another worker would have
+        other_worker = LocMemCache("shared", {})
+        other_worker.clear()
+        key = post_version_key(self.post.pk)
+        self.authorized_client.get(self.profile_url)
+        seen = other_worker.get(key)
+        self.assertIsNotNone(seen)
+        self.authorized_client.post(
+            self.edit_url, data={"text": "Новый текст"}
+        )
+        self.assertNotEqual(other_worker.get(key), seen)
+        self.assertIsNone(cache.get(key))
+
+    def test_edit_link_is_rendered_per_viewer(self):
+        response = self.authorized_client.get(self.profile_url)
+        self.assertContains(response, self.edit_url)
+        response = self.other_client.get(self.profile_url)
+        self.assertNotContains(response, self.edit_url)
+
+
+@override_settings(POSTS_PAGE_CACHE_TIMEOUT=60)
+class AnonymousPageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser")
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.guest_client = Client()
+        self.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        self.other_group = Group.objects.create(
+            title="Другая группа",
+            slug="other-slug",
+            description="Описание другой группы"
+        )
+        Post.objects.create(
+            text="Исходный текст", author=self.user, group=self.group
+        )
+        self.urls = (
+            reverse("index"),
+            reverse("group_posts", kwargs={"slug": self.group.slug}),
+            reverse("profile", kwargs={"username": self.user.username}),
+        )
+
+    def test_repeated_anonymous_requests_skip_the_database(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    response = self.guest_client.get(url)
+                self.assertContains(response, "Исходный текст")
+
+    def test_new_post_shows_up_immediately(self):
+        for url in self.urls:
+            self.guest_client.get(url)
+        self.authorized_client.post(
+            reverse("new_post"),
+            data={"text": "Свежий пост", "group": self.group.id}
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), "Свежий пост")
+
+    def test_unrelated_feeds_stay_cached(self):
+        group_url = self.urls[1]
+        self.guest_client.get(group_url)
+        Post.objects.create(
+            text="Пост в другой группе",
+            author=self.user,
+            group=self.other_group
+        )
+        with self.assertNumQueries(0):
+            self.guest_client.get(group_url)
+
+    def test_authorized_requests_are_not_cached(self):
+        self.authorized_client.get(self.urls[0])
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(self.urls[0])
+        self.assertTrue(queries)
+
+
+class VersionCacheCheckTest(TestCase):
+    def test_page_cache_needs_a_shared_version_cache(self):
+        self.assertEqual(check_version_cache(None), [])
+        with override_settings(POSTS_PAGE_CACHE_TIMEOUT=60):
+            errors = check_version_cache(None)
+            self.assertEqual([error.id for error in errors], ["posts.E001"])
+            shared = {
+                **settings.CACHES,
+                "shared": {
+                    "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+                },
+            }
+            with override_settings(
+                    CACHES=shared, POSTS_VERSION_CACHE="shared"):
+                self.assertEqual(check_version_cache(None), [])
@@ -0,0 +1,111 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+@override_settings(POSTS_CONDITIONAL_GET=True)
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser")
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.guest_client = Client()
+        self.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        self.post = Post.objects.create(
+            text="Исходный текст", author=self.user, group=self.group
+        )
+        self.post_url = reverse("post", kwargs={
+            "username": self.user.username,
+            "post_id": self.post.id
+        })
+        self.urls = (
+            reverse("index"),
+            reverse("group_posts", kwargs={"slug": self.group.slug}),
+            reverse("profile", kwargs={"username": self.user.username}),
+            self.post_url,
+        )
+
+    def test_unchanged_pages_answer_not_modified(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)["ETag"]
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.content)
+
+    def test_feed_not_modified_skips_database(self):
+        etag = self.guest_client.get(reverse("index"))["ETag"]
+        with self.assertNumQueries(0):
+            self.guest_client.get(reverse("index"), HTTP_IF_NONE_MATCH=etag)
+
+    def test_last_modified_is_honoured(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                last_modified = self.guest_client.get(url)["Last-Modified"]
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=last_modified
+                )
+                self.assertEqual(response.status_code, 304)
+
+    def test_post_edit_changes_validators(self):
+        etags = {url: self.guest_client.get(url)["ETag"] for url in self.urls}
+        self.authorized_client.post(
+            reverse("post_edit", kwargs={
+                "username": self.user.username,
+                "post_id": self.post.id
+            }),
+            data={"text": "Новый текст", "group": self.group.id}
+        )
+        self.post.refresh_from_db()
+        self.assertGreater(self.post.updated, self.post.pub_date)
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "Новый текст")
+
+    def test_viewer_is_part_of_the_etag(self):
+        anonymous = self.guest_client.get(self.post_url)["ETag"]
+        response = self.authorized_client.get(
+            self.post_url, HTTP_IF_NONE_MATCH=anonymous
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_session_is_part_of_the_etag(self):
+        etag = self.authorized_client.get(self.urls[0])["ETag"]
+        self.authorized_client.logout()
+        self.authorized_client.force_login(self.user)
+        response = self.authorized_client.get(
+            self.urls[0], HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Cookie", response["Vary"])
+
+    def test_errors_have_no_validators(self):
+        urls = (
+            reverse("group_posts", kwargs={"slug": "missing"}),
+            reverse("profile", kwargs={"username": "missing"}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertFalse(response.has_header("ETag"))
+                self.assertFalse(response.has_header("Last-Modified"))
+
+    @override_settings(POSTS_CONDITIONAL_GET=False)
+    def test_no_validators_while_off(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertFalse(self.guest_client.get(url).has_header("ETag"))
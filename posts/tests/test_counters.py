@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import AuthorCounter, Group, GroupCounter, Post, User
+
+
+class PostCountersTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.group1 = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        self.group2 = Group.objects.create(
+            title="Тестовая группа 2",
+            slug="test-slug2",
+            description="Тестовое описание группы 2"
+        )
+
+    def counts(self):
+        return (
+            AuthorCounter.objects.get(author=self.user).posts_count,
+            {
+                counter.group_id: counter.posts_count
+                for counter in GroupCounter.objects.all()
+            }
+        )
+
+    def test_counters_follow_create_edit_and_delete(self):
+        self.authorized_client.post(
+            reverse("new_post"),
+            data={"text": "Тестовый текст", "group": self.group1.id}
+        )
+        post = Post.objects.get(text="Тестовый текст")
+        self.assertEqual(self.counts(), (1, {self.group1.id: 1}))
+
+        self.authorized_client.post(
+            reverse("post_edit", kwargs={
+                "username": self.user.username,
+                "post_id": post.id
+            }),
+            data={"text": "Тестовый текст", "group": self.group2.id}
+        )
+        self.assertEqual(
+            self.counts(), (1, {self.group1.id: 0, self.group2.id: 1})
+        )
+
+        post.refresh_from_db()
+        post.delete()
+        self.assertEqual(
+            self.counts(), (0, {self.group1.id: 0, self.group2.id: 0})
+        )
+
+    def test_group_deletion_drops_its_counter(self):
+        Post.objects.create(text="Текст", author=self.user, group=self.group1)
+        self.group1.delete()
+        self.assertFalse(GroupCounter.objects.exists())
+        self.assertEqual(AuthorCounter.objects.get().posts_count, 1)
+
+    def test_rebuild_command_restores_exact_counts(self):
+        for _ in range(3):
+            Post.objects.create(
+                text="Текст", author=self.user, group=self.group1
+            )
+        AuthorCounter.objects.update(posts_count=42)
+        GroupCounter.objects.all().delete()
+        call_command(
+            "rebuild_post_counters", chunk_size=1, stdout=StringIO()
+        )
+        self.assertEqual(
+            self.counts(), (3, {self.group1.id: 3, self.group2.id: 0})
+        )
+
+    def test_profile_reads_counter_instead_of_counting(self):
+        Post.objects.create(text="Текст", author=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(
+                reverse("profile", kwargs={"username": self.user.username})
+            )
+        self.assertEqual(response.context["count_posts"], 1)
+        self.assertEqual(response.context["paginator"].count, 1)
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries)
+        )
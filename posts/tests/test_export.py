@@ -0,0 +1,102 @@
+import csv
+import datetime
+import io
+import json
+
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.export import export_queryset, iter_rows
+from posts.models import Group, Post, User
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        cls.other = User.objects.create_user(username="other")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=cls.user, group=cls.group)
+            for i in range(25)
+        )
+        Post.objects.create(text="Чужой пост", author=cls.other)
+        cls.old = Post.objects.create(text="Старый пост", author=cls.other)
+        Post.objects.filter(pk=cls.old.pk).update(
+            pub_date=timezone.now() - datetime.timedelta(days=30)
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def export(self, **params):
+        response = self.guest_client.get(reverse("api:export"), params)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_chunks_cover_everything_once(self):
+        posts = export_queryset()
+        with self.assertNumQueries(4):
+            ids = [row.id for row in iter_rows(posts, chunk_size=9)]
+        self.assertEqual(ids, list(Post.objects.values_list("id", flat=True)))
+
+    def test_ndjson_filters(self):
+        response, body = self.export(group="test-slug")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(records), 25)
+        self.assertEqual({r["group"] for r in records}, {"test-slug"})
+        today = timezone.localdate()
+        _, body = self.export(author="other", since=today.isoformat())
+        self.assertEqual(len(body.splitlines()), 1)
+        _, body = self.export(
+            until=(today - datetime.timedelta(days=1)).isoformat()
+        )
+        self.assertEqual(json.loads(body)["id"], self.old.id)
+
+    def test_resume_from_cursor(self):
+        _, body = self.export()
+        records = [json.loads(line) for line in body.splitlines()]
+        _, rest = self.export(after=records[9]["cursor"])
+        resumed = [json.loads(line) for line in rest.splitlines()]
+        self.assertEqual(resumed, records[10:])
+
+    def test_csv(self):
+        response, body = self.export(format="csv", author="testuser")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[0]["author"], "testuser")
+
+    def test_bad_parameters(self):
+        for params in ({"format": "xml"}, {"since": "вчера"},
+                       {"until": "2020-13-45"},
+                       {"after": "мусор"}):
+            with self.subTest(params=params):
+                response = self.guest_client.get(
+                    reverse("api:export"), params
+                )
+                self.assertEqual(response.status_code, 400)
+        response = self.guest_client.get(
+            reverse("api:export"), {"group": "missing"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("export_posts", "--author=other", stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(records), 2)
+        out = io.StringIO()
+        call_command(
+            "export_posts", "--format=csv", "--chunk-size=4",
+            f"--after={records[0]['cursor']}", stdout=out
+        )
+        self.assertEqual(len(out.getvalue().splitlines()), 27)
+        with self.assertRaises(CommandError):
+            call_command("export_posts", "--group=missing", stdout=out)
@@ -0,0 +1,85 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.views import POSTS_PER_PAGE
+
+
+class FeedQueryCountTest(TestCase):
+    # Anonymous requests: one query per object looked up from the URL plus
+    # the page itself, and COUNT(*) only for the index paginator.
+    expected_queries = {
+        "index": 2,
+        "group_posts": 2,
+        "profile": 2,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        cls.authors = [
+            User.objects.create_user(
+                username=f"author{i}", first_name="Имя", last_name="Фамилия"
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def urls(self):
+        return {
+            "index": reverse("index"),
+            "group_posts": reverse(
+                "group_posts", kwargs={"slug": self.group.slug}
+            ),
+            "profile": reverse(
+                "profile", kwargs={"username": self.authors[0].username}
+            ),
+        }
+
+    def create_posts(self, count):
+        for i in range(count):
+            Post.objects.create(
+                text=f"Пост {i}",
+                author=self.authors[i % len(self.authors)],
+                group=self.group
+            )
+
+    def assert_query_counts(self, expected_queries):
+        for name, url in self.urls().items():
+            with self.subTest(view=name):
+                with self.assertNumQueries(expected_queries[name]):
+                    self.guest_client.get(url)
+
+    def test_query_count_with_single_post(self):
+        self.create_posts(1)
+        self.assert_query_counts(self.expected_queries)
+
+    def test_query_count_with_full_page(self):
+        self.create_posts(POSTS_PER_PAGE * 3)
+        self.assert_query_counts(self.expected_queries)
+
+    @override_settings(POSTS_CURSOR_PAGINATION=True)
+    def test_query_count_in_cursor_mode(self):
+        self.create_posts(POSTS_PER_PAGE * 3)
+        self.assert_query_counts({
+            "index": 1,
+            "group_posts": 2,
+            "profile": 2,
+        })
+
+    def test_post_view_query_count(self):
+        self.create_posts(1)
+        post = Post.objects.select_related("author").get()
+        url = reverse("post", kwargs={
+            "username": post.author.username,
+            "post_id": post.id
+        })
+        # The post with its author
+        with self.assertNumQueries(1):
+            self.guest_client.get(url)
@@ -0,0 +1,164 @@
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import (Follow, PendingFanout, Post, TimelineEntry,
+                          User)
+from posts.timeline import process_pending
+from posts.views import POSTS_PER_PAGE
+
+
+class FollowTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="reader")
+        cls.author = User.objects.create_user(username="author")
+        cls.stranger = User.objects.create_user(username="stranger")
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def follow(self, author, action="profile_follow"):
+        return self.client.post(
+            reverse(action, kwargs={"username": author.username})
+        )
+
+    def feed(self, client=None, **params):
+        client = client or self.client
+        return client.get(reverse("follow_index"), params).context["page"]
+
+    def test_follow_and_unfollow_update_counts(self):
+        response = self.follow(self.author)
+        self.assertRedirects(
+            response, reverse("profile", kwargs={"username": "author"})
+        )
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=self.author).exists()
+        )
+        profile = self.client.get(response.url)
+        self.assertEqual(profile.context["followers_count"], 1)
+        self.assertTrue(profile.context["following"])
+        self.assertContains(profile, "Подписчиков: 1")
+        own = self.client.get(
+            reverse("profile", kwargs={"username": "reader"})
+        )
+        self.assertEqual(own.context["following_count"], 1)
+        self.follow(self.author)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.follow(self.author, "profile_unfollow")
+        self.assertFalse(Follow.objects.exists())
+        profile = self.client.get(response.url)
+        self.assertEqual(profile.context["followers_count"], 0)
+        self.assertFalse(profile.context["following"])
+
+    def test_follow_needs_post_and_another_author(self):
+        url = reverse("profile_follow", kwargs={"username": "author"})
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.follow(self.user)
+        self.assertFalse(Follow.objects.exists())
+        guest = Client().post(url)
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(guest.status_code, 302)
+
+    def test_new_posts_reach_followers_only(self):
+        self.follow(self.author)
+        post = Post.objects.create(text="Новая запись", author=self.author)
+        self.assertTrue(
+            PendingFanout.objects.filter(post_id=post.pk).exists()
+        )
+        self.assertEqual(process_pending(), 1)
+        self.assertFalse(PendingFanout.objects.exists())
+        self.assertEqual(list(self.feed()), [post])
+        stranger = Client()
+        stranger.force_login(self.stranger)
+        self.assertFalse(self.feed(stranger))
+        post.delete()
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_authors_without_followers_queue_nothing(self):
+        Post.objects.create(text="Запись", author=self.author)
+        self.assertFalse(PendingFanout.objects.exists())
+
+    def test_fan_out_in_batches(self):
+        for user in (self.user, self.stranger):
+            Follow.objects.create(user=user, author=self.author)
+        Post.objects.create(text="Запись", author=self.author)
+        self.assertEqual(process_pending(batch_size=1), 2)
+        self.assertEqual(TimelineEntry.objects.count(), 2)
+
+    def test_follow_backfills_and_unfollow_clears(self):
+        posts = [
+            Post.objects.create(text=f"Запись {i}", author=self.author)
+            for i in range(3)
+        ]
+        self.follow(self.author)
+        self.assertEqual(list(self.feed()), posts[::-1])
+        self.follow(self.author, "profile_unfollow")
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertFalse(self.feed())
+
+    @override_settings(
+        POSTS_TIMELINE_FANOUT_LIMIT=2, POSTS_TIMELINE_BACKFILL=1
+    )
+    def test_popular_authors_are_read_on_request(self):
+        Follow.objects.create(user=self.user, author=self.stranger)
+        self.follow(self.author)
+        Follow.objects.create(user=self.stranger, author=self.author)
+        posts = []
+        for i in range(POSTS_PER_PAGE + 2):
+            author = (self.author, self.stranger)[i % 2]
+            posts.append(
+                Post.objects.create(text=f"Запись {i}", author=author)
+            )
+        self.assertFalse(
+            PendingFanout.objects.filter(author=self.author).exists()
+        )
+        process_pending()
+        posts.reverse()
+        page = self.feed()
+        self.assertEqual(list(page), posts[:POSTS_PER_PAGE])
+        page = self.feed(after=page.next_cursor)
+        self.assertEqual(list(page), posts[POSTS_PER_PAGE:])
+        self.assertFalse(page.has_next())
+        page = self.feed(before=page.previous_cursor)
+        self.assertEqual(list(page), posts[:POSTS_PER_PAGE])
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=2)
+    def test_author_dropping_below_the_limit_is_materialized(self):
+        others = [
+            User.objects.create_user(username=f"other{i}") for i in range(2)
+        ]
+        for user in others:
+            Follow.objects.create(user=user, author=self.author)
+        posts = [
+            Post.objects.create(text=f"Запись {i}", author=self.author)
+            for i in range(2)
+        ]
+        # Followed while the author was read on request: no backfill
+        self.follow(self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(list(self.feed()), posts[::-1])
+        for user in others:
+            Follow.objects.filter(user=user, author=self.author).delete()
+        process_pending()
+        self.assertEqual(
+            set(TimelineEntry.objects.values_list("user_id", "post_id")),
+            {(self.user.pk, post.pk) for post in posts}
+        )
+        self.assertEqual(list(self.feed()), posts[::-1])
+
+    def test_unfollow_during_fan_out_leaves_no_entries(self):
+        self.follow(self.author)
+        Post.objects.create(text="Запись", author=self.author)
+        bulk_create = TimelineEntry.objects.bulk_create
+
+        def unfollow_first(*args, **kwargs):
+            Follow.objects.filter(user=self.user).delete()
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(
+                TimelineEntry.objects, "bulk_create", unfollow_first):
+            process_pending()
+        self.assertFalse(TimelineEntry.objects.exists())
@@ -0,0 +1,133 @@
+import datetime
+import re
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+from posts.views import MAX_MERGED_GROUPS, POSTS_PER_PAGE
+
+SHARDS = ["shard0", "shard1"]
+
+
+class GroupsFeedTest(TestCase):
+    databases = {"default", *SHARDS}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author")
+        cls.groups = [
+            Group.objects.create(title=f"Группа {i}", slug=f"group-{i}")
+            for i in range(3)
+        ]
+        start = timezone.now() - datetime.timedelta(days=1)
+        cls.posts = []
+        for i in range(POSTS_PER_PAGE * 2 + 3):
+            post = Post.objects.create(
+                text=f"Запись {i}",
+                author=cls.user,
+                group=cls.groups[i % 2]
+            )
+            # Same date for a pair of posts: ties are broken by id
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=start + datetime.timedelta(minutes=i // 2)
+            )
+            cls.posts.append(post)
+        Post.objects.create(text="Без группы", author=cls.user)
+        cls.posts.reverse()
+
+    def setUp(self):
+        self.client = Client()
+
+    def url(self, *slugs):
+        return reverse("groups_posts", kwargs={"slugs": slugs})
+
+    def feed(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.context["page"]
+
+    def walk(self, url):
+        page = self.feed(url)
+        posts = list(page)
+        while page.has_next():
+            page = self.feed(url, after=page.next_cursor)
+            posts.extend(page)
+        return posts, page
+
+    def test_url(self):
+        self.assertEqual(self.url("a", "b-c"), "/group/a+b-c/")
+        self.assertEqual(
+            reverse("group_posts", kwargs={"slug": "a"}), "/group/a/"
+        )
+
+    def test_pages_merge_groups_newest_first(self):
+        url = self.url("group-0", "group-1", "group-2")
+        posts, page = self.walk(url)
+        self.assertEqual(posts, self.posts)
+        previous = self.feed(url, before=page.previous_cursor)
+        self.assertEqual(
+            list(previous),
+            self.posts[POSTS_PER_PAGE:POSTS_PER_PAGE * 2]
+        )
+        response = self.client.get(url)
+        for group in self.groups:
+            self.assertContains(response, group.title)
+
+    def test_repeated_slugs_are_read_once(self):
+        page = self.feed(self.url("group-0", "group-0"))
+        self.assertEqual(
+            list(page),
+            [post for post in self.posts if post.group_id == self.groups[0].pk]
+            [:POSTS_PER_PAGE]
+        )
+
+    def test_unknown_or_too_many_groups(self):
+        response = self.client.get(self.url("group-0", "missing"))
+        self.assertEqual(response.status_code, 404)
+        slugs = [f"group-{i}" for i in range(MAX_MERGED_GROUPS + 1)]
+        self.assertEqual(self.client.get(self.url(*slugs)).status_code, 404)
+
+    def test_page_reads_about_one_page_of_rows(self):
+        url = self.url("group-0", "group-1", "group-2")
+        page = self.feed(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.feed(url, after=page.next_cursor)
+        limits = [
+            int(re.search(r"LIMIT (\d+)", query["sql"]).group(1))
+            for query in queries
+            if query["sql"].startswith('SELECT "posts_post"."id"')
+        ]
+        # An even share of the page from each group, then more from the
+        # two groups that hold it
+        self.assertEqual(limits[:3], [POSTS_PER_PAGE // 3 + 1] * 3)
+        self.assertEqual(len(limits), 5)
+        self.assertLess(sum(limits), (POSTS_PER_PAGE + 1) * len(self.groups))
+
+
+@override_settings(POSTS_SHARDS=SHARDS)
+class ShardedGroupsFeedTest(TestCase):
+    databases = {"default", *SHARDS}
+
+    def test_groups_merge_across_shards(self):
+        groups = [
+            Group.objects.create(title=f"Группа {i}", slug=f"group-{i}")
+            for i in range(3)
+        ]
+        posts = []
+        for i in range(POSTS_PER_PAGE + 3):
+            author = User.objects.create_user(username=f"author-{i}")
+            posts.append(Post.objects.create(
+                text=f"Запись {i}", author=author, group=groups[i % 3]
+            ))
+        url = reverse(
+            "groups_posts", kwargs={"slugs": [g.slug for g in groups]}
+        )
+        page = self.client.get(url).context["page"]
+        found = list(page)
+        page = self.client.get(url, {"after": page.next_cursor})
+        found.extend(page.context["page"])
+        self.assertEqual(found, posts[::-1])
@@ -0,0 +1,117 @@
+import datetime
+import io
+import json
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.importer import PostImporter
+from posts.models import AuthorCounter, Group, GroupCounter, Post, User
+
+
+def ndjson(*records):
+    return [json.dumps(record, ensure_ascii=False) for record in records]
+
+
+class ImportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_batches_keep_dates_and_update_counters(self):
+        lines = ndjson(*(
+            {"text": f"Пост {i}", "author": "testuser", "group": "test-slug",
+             "pub_date": f"2019-01-{i + 1:02d}T12:00:00+00:00"}
+            for i in range(25)
+        ))
+        importer = PostImporter(batch_size=10)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(importer.load(lines), 25)
+        statements = [query["sql"] for query in queries]
+        inserts = [
+            sql for sql in statements
+            if sql.startswith('INSERT INTO "posts_post"')
+        ]
+        lookups = [sql for sql in statements if '"username" IN' in sql]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(importer.errors, [])
+        latest = Post.objects.first()
+        self.assertEqual(latest.text, "Пост 24")
+        self.assertEqual(latest.pub_date, datetime.datetime(
+            2019, 1, 25, 12, tzinfo=datetime.timezone.utc
+        ))
+        self.assertEqual(latest.updated, latest.pub_date)
+        self.assertEqual(
+            AuthorCounter.objects.get(author=self.user).posts_count, 25
+        )
+        self.assertEqual(
+            GroupCounter.objects.get(group=self.group).posts_count, 25
+        )
+        new = Post.objects.create(text="Новый", author=self.user)
+        self.assertGreater(new.pub_date, latest.pub_date)
+
+    def test_only_loaded_authors_and_groups_are_recounted(self):
+        other = User.objects.create_user(username="other")
+        Post.objects.create(text="Пост", author=other)
+        # A stale counter outside the load stays as it is
+        AuthorCounter.objects.filter(author=other).update(posts_count=7)
+        PostImporter().load(ndjson({"text": "Пост", "author": "testuser"}))
+        self.assertEqual(
+            AuthorCounter.objects.get(author=self.user).posts_count, 1
+        )
+        self.assertEqual(
+            AuthorCounter.objects.get(author=other).posts_count, 7
+        )
+
+    def test_invalid_records_are_skipped(self):
+        lines = ndjson(
+            {"text": "Хороший", "author": "testuser"},
+            {"text": "", "author": "testuser"},
+            {"text": "Без автора", "author": "nobody"},
+            {"text": "Без группы", "author": "testuser", "group": "missing"},
+            {"text": "Плохая дата", "author": "testuser", "pub_date": "x"},
+            {"text": "Странный автор", "author": ["testuser"]},
+        ) + ["{не json", "[]"]
+        importer = PostImporter()
+        self.assertEqual(importer.load(lines), 1)
+        self.assertEqual(
+            [number for number, _ in importer.errors], [2, 3, 4, 5, 6, 7, 8]
+        )
+
+    def test_feeds_see_imported_posts(self):
+        client = Client()
+        client.get(reverse("index"))
+        PostImporter().load(ndjson({"text": "Импорт", "author": "testuser"}))
+        response = client.get(reverse("index"))
+        self.assertEqual(response.context["page"][0].text, "Импорт")
+
+    def test_export_round_trip(self):
+        Post.objects.create(text="Один", author=self.user, group=self.group)
+        Post.objects.create(text="Два", author=self.user)
+        exported = io.StringIO()
+        call_command("export_posts", stdout=exported)
+        Post.objects.all().delete()
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as dump:
+            dump.write(exported.getvalue())
+            dump.flush()
+            out = io.StringIO()
+            call_command("import_posts", dump.name, stdout=out)
+        self.assertIn("Загружено: 2", out.getvalue())
+        self.assertEqual(
+            list(Post.objects.values_list("text", "group__slug")),
+            [("Два", None), ("Один", "test-slug")]
+        )
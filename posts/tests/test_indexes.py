@@ -0,0 +1,54 @@
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+class FeedIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        Post.objects.create(
+            text="Текст тестового поста",
+            author=cls.user,
+            group=cls.group
+        )
+
+    def feed_query_plan(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            Client().get(url)
+        feed_queries = [
+            query["sql"] for query in queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "posts_post"' in query["sql"]
+            and "ORDER BY" in query["sql"]
+        ]
+        self.assertEqual(len(feed_queries), 1)
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + feed_queries[0])
+            return " ".join(row[-1] for row in cursor.fetchall())
+
+    def test_feed_queries_use_composite_indexes(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN is SQLite specific")
+        urls_indexes = {
+            reverse("index"): "post_feed_idx",
+            reverse(
+                "group_posts", kwargs={"slug": self.group.slug}
+            ): "post_group_feed_idx",
+            reverse(
+                "profile", kwargs={"username": self.user.username}
+            ): "post_author_feed_idx",
+        }
+        for url, index_name in urls_indexes.items():
+            with self.subTest(url=url):
+                plan = self.feed_query_plan(url)
+                self.assertIn(index_name, plan)
+                self.assertNotIn("TEMP B-TREE", plan)
@@ -0,0 +1,87 @@
+import io
+import json
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from posts.dataset import generate
+from posts.models import Post
+from yatube.loadtest import Request, from_log, generated_mix, replay
+
+LOG = """\
+127.0.0.1 - - [18/Oct/2026:10:00:00 +0300] "GET / HTTP/1.1" 200 5120 "-" "curl"
+127.0.0.1 - - [18/Oct/2026:10:00:01 +0300] "GET /seed_user_0/ HTTP/1.1" 200 512
+[18/Oct/2026 10:00:02] "POST /new/ HTTP/1.1" 302 0
+[18/Oct/2026 10:00:03] "POST /auth/login/ HTTP/1.1" 302 0
+[18/Oct/2026 10:00:04] "GET /missing/page/here/ HTTP/1.1" 404 0
+garbage line
+"""
+
+
+class ReplayTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(50, authors=5, groups=3)
+
+    def test_log_parsing(self):
+        requests = list(from_log(LOG.splitlines(), "seed_user_0"))
+        self.assertEqual(requests, [
+            Request("GET", "/", None),
+            Request("GET", "/seed_user_0/", None),
+            Request("POST", "/new/", "seed_user_0"),
+            Request("GET", "/missing/page/here/", None),
+        ])
+
+    def test_authenticated_writes(self):
+        post = Post.objects.select_related("author").first()
+        requests = [
+            Request("POST", "/new/", post.author.username),
+            Request(
+                "POST",
+                f"/{post.author.username}/{post.id}/edit/",
+                post.author.username
+            ),
+            Request("GET", "/", None),
+        ]
+        report = replay(requests, workers=1)
+        self.assertEqual(report["requests"], 3)
+        for name in ("new_post", "post_edit"):
+            self.assertEqual(report["by_name"][name]["statuses"], {"302": 1})
+        self.assertEqual(Post.objects.count(), 51)
+        self.assertTrue(
+            Post.objects.get(pk=post.pk).text.startswith("Нагрузочная")
+        )
+
+    def test_generated_mix_report(self):
+        report = replay(generated_mix(60, seed=3), workers=1)
+        self.assertEqual(report["requests"], 60)
+        self.assertGreater(report["throughput"], 0)
+        for name, stats in report["by_name"].items():
+            with self.subTest(name=name):
+                self.assertEqual(stats["errors"], 0)
+                self.assertLessEqual(
+                    stats["latency_ms"]["p50"], stats["latency_ms"]["p99"]
+                )
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".log") as log:
+            log.write(LOG)
+            log.flush()
+            out = io.StringIO()
+            call_command(
+                "replay", log.name, "--workers=1",
+                stdout=out, stderr=io.StringIO()
+            )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["by_name"]["unknown"]["statuses"], {"404": 1})
+
+
+class ConcurrentReplayTest(TransactionTestCase):
+    def test_threads(self):
+        generate(30, authors=3, groups=2)
+        report = replay(generated_mix(40), workers=4)
+        self.assertEqual(report["requests"], 40)
+        self.assertEqual(
+            sum(stats["count"] for stats in report["by_name"].values()), 40
+        )
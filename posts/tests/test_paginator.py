@@ -0,0 +1,129 @@
+from django.core.paginator import Page, Paginator
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User
+from posts.paginator import CursorPage, UncountedPaginator
+from posts.templatetags.pagination_tags import page_window
+from posts.views import POSTS_PER_PAGE
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=cls.user)
+            for i in range(POSTS_PER_PAGE * 2 + 5)
+        )
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_pages_walk_whole_feed_in_order(self):
+        expected = list(
+            Post.objects.order_by("-pub_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        seen = []
+        response = self.client.get(reverse("index"))
+        while True:
+            page = response.context["page"]
+            self.assertIsInstance(page, CursorPage)
+            seen.extend(post.id for post in page)
+            if not page.has_next():
+                break
+            response = self.client.get(
+                reverse("index"), {"after": page.next_cursor}
+            )
+        self.assertEqual(seen, expected)
+
+    def test_before_returns_previous_page(self):
+        first = self.client.get(reverse("index")).context["page"]
+        second = self.client.get(
+            reverse("index"), {"after": first.next_cursor}
+        ).context["page"]
+        back = self.client.get(
+            reverse("index"), {"before": second.previous_cursor}
+        ).context["page"]
+        self.assertEqual(
+            [post.id for post in back], [post.id for post in first]
+        )
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_deep_page_costs_same_as_first(self):
+        with CaptureQueriesContext(connection) as first_queries:
+            first = self.client.get(reverse("index")).context["page"]
+        with CaptureQueriesContext(connection) as deep_queries:
+            self.client.get(reverse("index"), {"after": first.next_cursor})
+        self.assertEqual(len(deep_queries), len(first_queries))
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in deep_queries)
+        )
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse("index"), {"after": "garbage"})
+        page = response.context["page"]
+        self.assertFalse(page.has_previous())
+        self.assertEqual(len(page), POSTS_PER_PAGE)
+
+    def test_page_number_links_keep_working(self):
+        response = self.client.get(reverse("index"), {"page": 2})
+        page = response.context["page"]
+        self.assertIsInstance(page, Page)
+        self.assertEqual(page.number, 2)
+
+
+class PageWindowTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=cls.user)
+            for i in range(POSTS_PER_PAGE * 50)
+        )
+
+    def test_window_is_bounded(self):
+        paginator = Paginator(Post.objects.all(), POSTS_PER_PAGE)
+        self.assertEqual(
+            page_window(paginator.page(25)),
+            [1, None, 23, 24, 25, 26, 27, None, 50]
+        )
+        self.assertEqual(page_window(paginator.page(1)), [1, 2, 3, None, 50])
+        self.assertEqual(
+            page_window(paginator.page(50)), [1, None, 48, 49, 50]
+        )
+
+    def test_window_without_count(self):
+        paginator = UncountedPaginator(Post.objects.all(), POSTS_PER_PAGE)
+        self.assertEqual(
+            page_window(paginator.page(10)),
+            [1, None, 8, 9, 10, 11, None]
+        )
+        self.assertEqual(
+            page_window(paginator.page(50)), [1, None, 48, 49, 50]
+        )
+
+    def test_response_size_does_not_depend_on_page_count(self):
+        profile_url = reverse("profile", kwargs={"username": "testuser"})
+        large = Client().get(profile_url, {"page": 25})
+        Post.objects.filter(
+            pk__in=Post.objects.values("pk")[:POSTS_PER_PAGE * 20]
+        ).delete()
+        small = Client().get(profile_url, {"page": 25})
+        self.assertEqual(large.content.count(b"page-item"), 11)
+        self.assertEqual(small.content.count(b"page-item"), 11)
+
+    @override_settings(POSTS_COUNT_FREE_PAGINATION=True)
+    def test_count_free_mode_skips_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = Client().get(reverse("index"), {"page": 3})
+        self.assertEqual(response.context["page"].number, 3)
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries)
+        )
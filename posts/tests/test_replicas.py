@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import tempfile
+
+from django.contrib.sessions.models import Session
+from django.db import connections, transaction
+from django.db.transaction import TransactionManagementError
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube.replicas import ReplicaRouter, current_replica, sync_replica
+
+
+class ReplicaRouterTest(TestCase):
+    def test_routing(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Post))
+        token = current_replica.set("replica")
+        try:
+            self.assertEqual(router.db_for_read(Post), "replica")
+            self.assertEqual(router.db_for_read(User), "replica")
+            self.assertEqual(router.db_for_read(Session), "default")
+            self.assertEqual(router.db_for_write(Post), "default")
+        finally:
+            current_replica.reset(token)
+        self.assertFalse(router.allow_migrate("replica", "posts"))
+        self.assertIsNone(router.allow_migrate("default", "posts"))
+
+
+@override_settings(DATABASE_REPLICA_READS=True)
+class ReplicaReadsTest(TransactionTestCase):
+    # The replica mirrors the test database through its own connection,
+    # which only sees committed rows.
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+        self.post = Post.objects.create(text="Тестовый пост", author=self.user)
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def queries(self, client, method, url, **data):
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections["replica"]) as replica:
+            getattr(client, method)(url, data)
+        return len(primary), len(replica)
+
+    def test_feeds_read_from_replica(self):
+        urls = (
+            reverse("index"),
+            reverse("profile", kwargs={"username": "testuser"}),
+            reverse("post", kwargs={
+                "username": "testuser", "post_id": self.post.id
+            }),
+            reverse("about:tech"),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                primary, replica = self.queries(self.guest_client, "get", url)
+                self.assertEqual(primary, 0)
+                if url != reverse("about:tech"):
+                    self.assertGreater(replica, 0)
+
+    def test_writes_go_to_primary_and_stick(self):
+        primary, replica = self.queries(
+            self.authorized_client, "post", reverse("new_post"),
+            text="Новый пост"
+        )
+        self.assertGreater(primary, 0)
+        primary, replica = self.queries(
+            self.authorized_client, "get", reverse("index")
+        )
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_other_views_use_primary(self):
+        primary, replica = self.queries(
+            self.authorized_client, "get", reverse("new_post")
+        )
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    @override_settings(DATABASE_REPLICA_READS=False)
+    def test_switched_off(self):
+        primary, replica = self.queries(
+            self.guest_client, "get", reverse("index")
+        )
+        self.assertEqual(replica, 0)
+
+
+class SyncReplicaTest(TransactionTestCase):
+    def test_backup_copies_primary(self):
+        user = User.objects.create_user(username="testuser")
+        Post.objects.create(text="Скопированный пост", author=user)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "replica.sqlite3")
+            databases = {"replica": {"NAME": path}}
+            with override_settings(DATABASES=databases):
+                sync_replica("replica")
+            copy = sqlite3.connect(path)
+            rows = copy.execute("SELECT text FROM posts_post").fetchall()
+            copy.close()
+        self.assertEqual(rows, [("Скопированный пост",)])
+
+    def test_refuses_inside_transaction(self):
+        with self.assertRaises(TransactionManagementError), \
+                transaction.atomic():
+            sync_replica("replica")
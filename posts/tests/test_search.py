@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+from posts.views import POSTS_PER_PAGE
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        cls.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+        Post.objects.bulk_create(
+            Post(text=f"Прогулка по лесу номер {i}", author=cls.user)
+            for i in range(POSTS_PER_PAGE + 5)
+        )
+        cls.exact = Post.objects.create(
+            text="Лес, лес и ещё раз лес", author=cls.user
+        )
+        cls.other = Post.objects.create(text="Про море", author=cls.user)
+
+    def setUp(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("FTS5 index is SQLite specific")
+        self.guest_client = Client()
+
+    def search(self, **params):
+        return self.guest_client.get(reverse("search"), params)
+
+    def test_best_match_comes_first(self):
+        page = self.search(q="лес").context["page"]
+        self.assertEqual(page[0], self.exact)
+        self.assertNotIn(self.other, page)
+
+    def test_prefix_and_case_insensitive(self):
+        page = self.search(q="ПРОГУЛ").context["page"]
+        self.assertEqual(len(page), POSTS_PER_PAGE)
+
+    def test_keyset_pages_cover_all_matches(self):
+        seen = []
+        page = self.search(q="лес").context["page"]
+        seen.extend(page)
+        while page.has_next():
+            page = self.search(q="лес", after=page.next_cursor).context["page"]
+            seen.extend(page)
+        self.assertEqual(len(seen), POSTS_PER_PAGE + 6)
+        self.assertEqual(len(set(seen)), len(seen))
+        back = self.search(q="лес", before=page.previous_cursor)
+        self.assertTrue(back.context["page"].has_next())
+
+    def test_index_follows_updates_and_deletes(self):
+        post = Post.objects.get(pk=self.other.pk)
+        post.text = "Про горы"
+        post.save()
+        self.assertFalse(self.search(q="море").context["page"])
+        self.assertIn(post, self.search(q="горы").context["page"])
+        post.delete()
+        self.assertFalse(self.search(q="горы").context["page"])
+
+    def test_syntax_in_query_is_not_interpreted(self):
+        response = self.search(q='лес" OR NOT (')
+        self.assertEqual(response.status_code, 200)
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO posts_post_fts(posts_post_fts) "
+                "VALUES ('delete-all')"
+            )
+        self.assertFalse(self.search(q="море").context["page"])
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertIn(self.other, self.search(q="море").context["page"])
+
+    def test_admin_search_uses_index(self):
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(
+            reverse("admin:posts_post_changelist"), {"q": "море"}
+        )
+        self.assertEqual(
+            list(response.context["cl"].result_list), [self.other]
+        )
+
+    def test_admin_search_finds_every_match(self):
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(
+            reverse("admin:posts_post_changelist"), {"q": "лес"}
+        )
+        self.assertEqual(
+            response.context["cl"].result_count, POSTS_PER_PAGE + 6
+        )
@@ -0,0 +1,278 @@
+import datetime
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import sharding
+from posts.counters import author_posts_count, group_posts_count
+from posts.importer import keep_dates
+from posts.models import Group, Post, User
+from posts.views import POSTS_PER_PAGE
+
+SHARDS = ["shard0", "shard1"]
+
+
+def on(alias):
+    return Post.objects.using(alias)
+
+
+@override_settings(POSTS_SHARDS=SHARDS)
+class ShardingTest(TestCase):
+    databases = {"default", *SHARDS}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = User.objects.create_user(username="first")
+        cls.second = User.objects.create_user(username="second")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        start = timezone.now() - datetime.timedelta(days=1)
+        cls.posts = []
+        for i in range(POSTS_PER_PAGE + 5):
+            post = Post.objects.create(
+                text=f"Прогулка номер {i}",
+                author=(cls.first, cls.second)[i % 2],
+                group=cls.group if i % 3 else None,
+            )
+            Post.objects.using(post._state.db).filter(pk=post.pk).update(
+                pub_date=start + datetime.timedelta(minutes=i)
+            )
+            cls.posts.append(post)
+        cls.posts.reverse()
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.first)
+
+    def feed(self, name, **params):
+        kwargs = {"slug": self.group.slug} if name == "group_posts" else {}
+        response = self.guest_client.get(reverse(name, kwargs=kwargs), params)
+        return response.context["page"]
+
+    def test_posts_live_on_author_shards(self):
+        self.assertNotEqual(
+            sharding.shard_for(self.first.pk),
+            sharding.shard_for(self.second.pk)
+        )
+        for author in (self.first, self.second):
+            self.assertEqual(
+                set(on(sharding.shard_for(author.pk))
+                    .values_list("author_id", flat=True)),
+                {author.pk}
+            )
+        self.assertFalse(on("default").exists())
+        ids = [post.pk for post in self.posts]
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_index_merges_shards(self):
+        page = self.feed("index")
+        self.assertEqual(list(page), self.posts[:POSTS_PER_PAGE])
+        self.assertEqual(page.paginator.count, len(self.posts))
+        page = self.feed("index", page=2)
+        self.assertEqual(list(page), self.posts[POSTS_PER_PAGE:])
+
+    @override_settings(POSTS_CURSOR_PAGINATION=True)
+    def test_cursor_pages_merge_shards(self):
+        seen = []
+        page = self.feed("index")
+        seen.extend(page)
+        while page.has_next():
+            page = self.feed("index", after=page.next_cursor)
+            seen.extend(page)
+        self.assertEqual(seen, self.posts)
+        page = self.feed("index", before=page.previous_cursor)
+        self.assertEqual(list(page), self.posts[:POSTS_PER_PAGE])
+
+    def test_group_feed_merges_shards(self):
+        in_group = [post for post in self.posts if post.group_id]
+        self.assertEqual(
+            list(self.feed("group_posts")), in_group[:POSTS_PER_PAGE]
+        )
+        self.assertEqual(group_posts_count(self.group), len(in_group))
+
+    def test_author_pages_read_one_shard(self):
+        post = self.posts[0]
+        other = SHARDS[1 - SHARDS.index(sharding.shard_for(post.author_id))]
+        urls = (
+            reverse("profile", kwargs={"username": post.author.username}),
+            reverse("post", kwargs={
+                "username": post.author.username, "post_id": post.pk
+            }),
+        )
+        for url in urls:
+            with self.subTest(url=url), \
+                    CaptureQueriesContext(connections[other]) as queries:
+                response = self.guest_client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(queries), 0)
+        self.assertEqual(
+            response.context["count_posts"], author_posts_count(post.author)
+        )
+
+    def test_new_and_edited_posts_go_to_author_shard(self):
+        self.authorized_client.post(reverse("new_post"), {"text": "Новый"})
+        shard = sharding.shard_for(self.first.pk)
+        post = on(shard).get(text="Новый")
+        self.assertGreater(post.pk, max(p.pk for p in self.posts))
+        self.authorized_client.post(
+            reverse("post_edit", kwargs={
+                "username": "first", "post_id": post.pk
+            }),
+            {"text": "Исправленный", "group": self.group.pk}
+        )
+        post = on(shard).get(pk=post.pk)
+        self.assertEqual(post.text, "Исправленный")
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(self.feed("group_posts")[0], post)
+
+    def test_search_merges_shards(self):
+        response = self.guest_client.get(reverse("search"), {"q": "прогулка"})
+        page = response.context["page"]
+        self.assertEqual(len(page), POSTS_PER_PAGE)
+        self.assertEqual(
+            {post.author_id for post in page},
+            {self.first.pk, self.second.pk}
+        )
+
+    def test_users_and_groups_are_replicated(self):
+        self.first.first_name = "Первый"
+        self.first.save()
+        self.group.delete()
+        for alias in SHARDS:
+            copy = User.objects.using(alias).get(pk=self.first.pk)
+            self.assertEqual(copy.first_name, "Первый")
+            self.assertFalse(Group.objects.using(alias).exists())
+            self.assertFalse(on(alias).filter(group__isnull=False).exists())
+
+    def test_deleting_an_author_deletes_sharded_posts(self):
+        in_group = [post for post in self.posts if post.group_id]
+        deleted = [
+            post for post in in_group if post.author_id == self.second.pk
+        ]
+        User.objects.get(pk=self.second.pk).delete()
+        for alias in SHARDS:
+            self.assertFalse(on(alias).filter(author_id=self.second.pk))
+            self.assertFalse(
+                User.objects.using(alias).filter(pk=self.second.pk)
+            )
+        self.assertEqual(
+            group_posts_count(Group.objects.get(pk=self.group.pk)),
+            len(in_group) - len(deleted)
+        )
+        self.assertEqual(
+            list(self.feed("index")),
+            [post for post in self.posts
+             if post.author_id == self.first.pk][:POSTS_PER_PAGE]
+        )
+
+
+class RebalanceTest(TestCase):
+    databases = {"default", *SHARDS}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание группы"
+        )
+        cls.authors = [
+            User.objects.create_user(username=f"author{i}") for i in range(3)
+        ]
+        for author in cls.authors:
+            Post.objects.bulk_create(
+                Post(text=f"Пост {i}", author=author, group=cls.group)
+                for i in range(3)
+            )
+        cls.ids = set(Post.objects.values_list("id", flat=True))
+
+    def rebalance(self):
+        call_command("rebalance_shards", chunk_size=2, stdout=StringIO())
+
+    def placement(self):
+        return {
+            alias: set(on(alias).values_list("id", flat=True))
+            for alias in ["default", *SHARDS]
+        }
+
+    def test_moves_posts_to_shards_and_back(self):
+        ids = set(self.ids)
+        with override_settings(POSTS_SHARDS=SHARDS):
+            self.rebalance()
+            placement = self.placement()
+            self.assertEqual(placement["default"], set())
+            self.assertEqual(placement["shard0"] | placement["shard1"], ids)
+            for author in self.authors:
+                self.assertEqual(
+                    on(sharding.shard_for(author.pk))
+                    .filter(author=author).count(),
+                    3
+                )
+            self.assertEqual(group_posts_count(self.group), 9)
+            post = Post.objects.create(text="Новый", author=self.authors[0])
+            self.assertGreater(post.pk, max(ids))
+            ids.add(post.pk)
+        self.rebalance()
+        placement = self.placement()
+        self.assertEqual(placement["default"], ids)
+        self.assertEqual(placement["shard0"] | placement["shard1"], set())
+
+    def test_new_ids_continue_above_posts_from_before_sharding(self):
+        with override_settings(POSTS_SHARDS=SHARDS):
+            posts = [
+                Post.objects.create(text=f"Новый {i}", author=author)
+                for i, author in enumerate(self.authors)
+            ]
+            self.assertGreater(
+                min(post.pk for post in posts), max(self.ids)
+            )
+            self.rebalance()
+        placement = self.placement()
+        self.assertEqual(
+            sum(len(ids) for ids in placement.values()),
+            len(self.ids) + len(posts)
+        )
+
+    def test_conflicting_ids_stop_the_move(self):
+        post = on("default").filter(author=self.authors[0]).first()
+        with override_settings(POSTS_SHARDS=SHARDS):
+            shard = sharding.shard_for(post.author_id)
+            sharding.copy_references(shard, {post.author_id}, set())
+            on(shard).bulk_create([
+                Post(pk=post.pk, text="Другая", author_id=post.author_id)
+            ])
+            with self.assertRaises(CommandError):
+                self.rebalance()
+        self.assertTrue(on("default").filter(pk=post.pk).exists())
+
+    def test_posts_of_users_from_before_sharding(self):
+        author = self.authors[0]
+        with override_settings(POSTS_SHARDS=SHARDS):
+            shard = sharding.shard_for(author.pk)
+            self.assertFalse(User.objects.using(shard).filter(pk=author.pk))
+            post = Post.objects.create(
+                text="Новый", author=author, group=self.group
+            )
+            self.assertEqual(on(shard).get(pk=post.pk).group, self.group)
+
+    def test_resumes_interrupted_move(self):
+        with override_settings(POSTS_SHARDS=SHARDS):
+            # A copy that was made before the move stopped
+            post = on("default").filter(author=self.authors[0]).first()
+            shard = sharding.shard_for(post.author_id)
+            sharding.copy_references(shard, {post.author_id}, {post.group_id})
+            with keep_dates():
+                on(shard).bulk_create([post])
+            self.rebalance()
+            placement = self.placement()
+        self.assertEqual(placement["shard0"] | placement["shard1"], self.ids)
+        self.assertFalse(placement["default"])
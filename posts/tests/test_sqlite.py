@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+from django.test import SimpleTestCase, TransactionTestCase
+
+from posts.models import Post, User
+from yatube.contention import PROFILES, open_connection, run
+
+
+class TunedBackendTest(SimpleTestCase):
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_on_new_connections(self):
+        with tempfile.TemporaryDirectory() as directory:
+            connection = open_connection(
+                "tuned", os.path.join(directory, "db.sqlite3")
+            )
+            connection.settings_dict["OPTIONS"] = {
+                "pragmas": {"busy_timeout": 1234}
+            }
+            try:
+                pragmas = {
+                    name: self.pragma(connection, name) for name in (
+                        "journal_mode", "synchronous", "busy_timeout",
+                        "foreign_keys"
+                    )
+                }
+            finally:
+                connection.close()
+        self.assertEqual(pragmas, {
+            "journal_mode": "wal",
+            "synchronous": 1,
+            "busy_timeout": 1234,
+            "foreign_keys": 1,
+        })
+
+    def test_transaction_mode(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "db.sqlite3")
+            writer, immediate, deferred = (
+                open_connection("tuned", path) for _ in range(3)
+            )
+            immediate.settings_dict["OPTIONS"] = {
+                "pragmas": {"busy_timeout": 0}
+            }
+            deferred.settings_dict["OPTIONS"] = {
+                "transaction_mode": "deferred"
+            }
+            try:
+                with writer.cursor() as cursor:
+                    cursor.execute("CREATE TABLE t (id integer)")
+                    writer._start_transaction_under_autocommit()
+                    cursor.execute("INSERT INTO t VALUES (1)")
+                with self.assertRaises(OperationalError):
+                    immediate._start_transaction_under_autocommit()
+                # A deferred read goes on while the writer holds the lock
+                with deferred.cursor() as cursor:
+                    deferred._start_transaction_under_autocommit()
+                    cursor.execute("SELECT COUNT(*) FROM t")
+                    self.assertEqual(cursor.fetchone()[0], 0)
+                    cursor.execute("COMMIT")
+                writer.cursor().execute("COMMIT")
+            finally:
+                for connection in (writer, immediate, deferred):
+                    connection.close()
+        broken = open_connection("tuned", ":memory:")
+        broken.settings_dict["OPTIONS"] = {"transaction_mode": "lazy"}
+        with self.assertRaises(ImproperlyConfigured):
+            broken.ensure_connection()
+
+
+class ContentionBenchmarkTest(TransactionTestCase):
+    def test_run(self):
+        user = User.objects.create_user(username="testuser")
+        Post.objects.create(text="Тестовый пост", author=user)
+        report = run(seconds=0.2, readers=1, writers=1)
+        self.assertEqual(
+            [result["profile"] for result in report["results"]],
+            list(PROFILES)
+        )
+        for result in report["results"]:
+            self.assertGreater(result["reads"]["per_second"], 0)
+            self.assertGreater(result["writes"]["per_second"], 0)
+        self.assertEqual(Post.objects.count(), 1)
@@ -0,0 +1,22 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from yatube.warmup import PHASES, warm_up
+
+
+class WarmUpTest(TestCase):
+    def test_every_phase_is_reported(self):
+        with self.assertLogs("yatube.warmup", "INFO") as logs:
+            report = warm_up()
+        self.assertEqual(list(report), [name for name, _ in PHASES])
+        self.assertGreater(report["templates"]["items"], 0)
+        self.assertGreater(report["urls"]["items"], 0)
+        self.assertEqual(len(logs.output), len(PHASES))
+
+    def test_command_prints_timings(self):
+        out = StringIO()
+        with self.assertLogs("yatube.warmup", "INFO"):
+            call_command("warmup", stdout=out)
+        self.assertIn("templates", out.getvalue())
@@ -0,0 +1,313 @@
+"""
+Follow feeds.
+
+Every user has a materialized timeline: a new post is queued on publish
+and copied into the timelines of the author's followers in batches, by a
+background thread of the web process or by ``manage.py fanout_timelines``.
+Following an author copies their latest posts right away.
+
+Authors with POSTS_TIMELINE_FANOUT_LIMIT followers or more are not fanned
+out; their posts are read at request time and merged into the timelines
+of their followers. When such an author drops below the limit, their
+latest posts are queued for fan-out to every follower they have then.
+"""
+
+import heapq
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+
+from . import sharding
+from .feeds import FeedQuery
+from .models import (Follow, FollowCounter, PendingFanout, Post,
+                     TimelineEntry)
+from .paginator import (CURSOR_ORDERING, CursorPage, InvalidCursor,
+                        decode_cursor, newer_than, older_than)
+
+logger = logging.getLogger(__name__)
+
+# One thread per process: jobs are drained in order and a burst of posts
+# doesn't start a burst of threads.
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fanout")
+
+
+def bump(user_id, field, delta):
+    rows = FollowCounter.objects.filter(user_id=user_id)
+    if delta < 0:
+        rows = rows.filter(**{f"{field}__gte": -delta})
+    updated = rows.update(**{field: F(field) + delta})
+    if not updated and delta > 0:
+        # Missing row: start it from the exact values, the new follow
+        # included
+        FollowCounter.objects.create(
+            user_id=user_id,
+            followers_count=Follow.objects.filter(author_id=user_id).count(),
+            following_count=Follow.objects.filter(user_id=user_id).count(),
+        )
+
+
+def follow_counts(user):
+    """(followers, following) of ``user``."""
+    try:
+        counter = user.follow_counter
+    except FollowCounter.DoesNotExist:
+        return 0, 0
+    return counter.followers_count, counter.following_count
+
+
+def is_following(user, author):
+    return (
+        user.is_authenticated
+        and Follow.objects.filter(user=user, author=author).exists()
+    )
+
+
+def fanned_out(author_id):
+    return not FollowCounter.objects.filter(
+        user_id=author_id,
+        followers_count__gte=settings.POSTS_TIMELINE_FANOUT_LIMIT
+    ).exists()
+
+
+def backfill(follow):
+    """Copy the latest posts of a newly followed author."""
+    if not fanned_out(follow.author_id):
+        return
+    posts = sharding.route(
+        Post.objects.filter(author_id=follow.author_id), follow.author_id
+    ).order_by(*CURSOR_ORDERING).values_list("id", "pub_date")
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=follow.user_id,
+                post_id=pk,
+                author_id=follow.author_id,
+                pub_date=pub_date
+            )
+            for pk, pub_date in posts[:settings.POSTS_TIMELINE_BACKFILL]
+        ),
+        ignore_conflicts=True
+    )
+
+
+def unfollowed(follow):
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id, author_id=follow.author_id
+    ).delete()
+    # Called after the decrement: the author has just dropped below the
+    # limit
+    if FollowCounter.objects.filter(
+            user_id=follow.author_id,
+            followers_count=settings.POSTS_TIMELINE_FANOUT_LIMIT - 1
+    ).exists():
+        materialize(follow.author_id)
+
+
+def schedule():
+    if settings.POSTS_TIMELINE_FANOUT_THREAD:
+        transaction.on_commit(lambda: executor.submit(drain))
+
+
+def enqueue(post):
+    # Authors without followers and authors read at request time have
+    # nothing to fan out.
+    if not FollowCounter.objects.filter(
+            user_id=post.author_id,
+            followers_count__gt=0,
+            followers_count__lt=settings.POSTS_TIMELINE_FANOUT_LIMIT,
+    ).exists():
+        return
+    PendingFanout.objects.create(
+        post_id=post.pk, author_id=post.author_id, pub_date=post.pub_date
+    )
+    schedule()
+
+
+def materialize(author_id):
+    """Queue the latest posts of an author that were read at request time
+    until now, including for followers who were not backfilled then."""
+    posts = sharding.route(
+        Post.objects.filter(author_id=author_id), author_id
+    ).order_by(*CURSOR_ORDERING).values_list("id", "pub_date")
+    PendingFanout.objects.bulk_create(
+        (
+            PendingFanout(post_id=pk, author_id=author_id, pub_date=pub_date)
+            for pk, pub_date in posts[:settings.POSTS_TIMELINE_BACKFILL]
+        ),
+        ignore_conflicts=True
+    )
+    schedule()
+
+
+def forget(post):
+    PendingFanout.objects.filter(post_id=post.pk).delete()
+    TimelineEntry.objects.filter(post_id=post.pk).delete()
+
+
+def fan_out(job, batch_size):
+    """Copy one queued post into the timelines of the followers of its
+    author, ``batch_size`` followers per transaction.
+
+    Progress is stored after every batch and entries that exist already
+    are skipped, so an interrupted job goes on where it stopped.
+    """
+    written = 0
+    while True:
+        with transaction.atomic():
+            followers = list(
+                Follow.objects.filter(
+                    author_id=job.author_id, user_id__gt=job.next_follower
+                )
+                .order_by("user_id")
+                .values_list("user_id", flat=True)[:batch_size]
+            )
+            if not followers:
+                PendingFanout.objects.filter(pk=job.pk).delete()
+                return written
+            TimelineEntry.objects.bulk_create(
+                (
+                    TimelineEntry(
+                        user_id=user_id,
+                        post_id=job.post_id,
+                        author_id=job.author_id,
+                        pub_date=job.pub_date
+                    )
+                    for user_id in followers
+                ),
+                ignore_conflicts=True
+            )
+            # A follow removed since the followers were read has had its
+            # entries deleted already; don't leave the new one behind
+            TimelineEntry.objects.filter(
+                post_id=job.post_id, user_id__in=followers
+            ).exclude(
+                user_id__in=Follow.objects.filter(
+                    author_id=job.author_id
+                ).values("user_id")
+            ).delete()
+            job.next_follower = followers[-1]
+            PendingFanout.objects.filter(pk=job.pk).update(
+                next_follower=job.next_follower
+            )
+        written += len(followers)
+
+
+def process_pending(batch_size=None):
+    """Fan out every queued post, oldest first. Returns the number of
+    timeline entries written."""
+    batch_size = batch_size or settings.POSTS_TIMELINE_BATCH_SIZE
+    written = 0
+    while True:
+        job = PendingFanout.objects.order_by("pk").first()
+        if job is None:
+            return written
+        written += fan_out(job, batch_size)
+
+
+def drain():
+    try:
+        process_pending()
+    except Exception:
+        # The jobs stay queued for the next run
+        logger.exception("timeline fan-out failed")
+    finally:
+        connections.close_all()
+
+
+class TimelinePaginator:
+    """Keyset pagination of the follow feed of ``user`` by
+    ``(pub_date, post id)``.
+
+    A page merges the user's timeline entries with the posts of the
+    followed authors that are read at request time, ``per_page + 1`` rows
+    of each.
+    """
+
+    def __init__(self, user, per_page):
+        self.user = user
+        self.per_page = int(per_page)
+
+    def get_page(self, after=None, before=None):
+        try:
+            if before:
+                return self._page(decode_cursor(before), backwards=True)
+            if after:
+                return self._page(decode_cursor(after))
+        except InvalidCursor:
+            pass
+        return self._page(None)
+
+    def entries(self, cursor, backwards):
+        entries = TimelineEntry.objects.filter(user=self.user)
+        if cursor is not None:
+            pub_date, pk = cursor
+            if backwards:
+                entries = entries.filter(
+                    Q(pub_date__gt=pub_date)
+                    | Q(pub_date=pub_date, post_id__gt=pk)
+                )
+            else:
+                entries = entries.filter(
+                    Q(pub_date__lt=pub_date)
+                    | Q(pub_date=pub_date, post_id__lt=pk)
+                )
+        ordering = ("pub_date", "post_id")
+        if not backwards:
+            ordering = ("-pub_date", "-post_id")
+        return list(
+            entries.order_by(*ordering)
+            .values_list("pub_date", "post_id")[:self.per_page + 1]
+        )
+
+    def unmaterialized(self, cursor, backwards):
+        authors = list(
+            Follow.objects.filter(
+                user=self.user,
+                author__follow_counter__followers_count__gte=(
+                    settings.POSTS_TIMELINE_FANOUT_LIMIT
+                )
+            ).values_list("author_id", flat=True)
+        )
+        if not authors:
+            return []
+        posts = sharding.route(
+            Post.objects.filter(author_id__in=authors)
+            .values_list("pub_date", "id", named=True)
+        ).order_by(*CURSOR_ORDERING)
+        if cursor is not None:
+            posts = posts.filter(
+                newer_than(*cursor) if backwards else older_than(*cursor)
+            )
+        if backwards:
+            posts = posts.reverse()
+        return [tuple(row) for row in posts[:self.per_page + 1]]
+
+    def _page(self, cursor, backwards=False):
+        merged = heapq.merge(
+            self.entries(cursor, backwards),
+            self.unmaterialized(cursor, backwards),
+            reverse=not backwards
+        )
+        rows = []
+        for row in merged:
+            # Authors that grew past the fan-out limit are in both
+            if not rows or rows[-1] != row:
+                rows.append(row)
+            if len(rows) > self.per_page:
+                break
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        posts = FeedQuery.index().queryset().in_bulk(
+            [pk for _, pk in rows]
+        )
+        return CursorPage(
+            [posts[pk] for _, pk in rows if pk in posts],
+            self,
+            has_next=True if backwards else has_more,
+            has_previous=has_more if backwards else cursor is not None,
+        )
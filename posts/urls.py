@@ -1,13 +1,29 @@
-from django.urls import path
+from django.urls import path, register_converter
 
 from . import views
+from .converters import SlugListConverter
+
+register_converter(SlugListConverter, "slugs")
 
 urlpatterns = [
     path("", views.index, name="index"),
     path("group/<slug:slug>/", views.group_posts, name="group_posts"),
+    path("group/<slugs:slugs>/", views.groups_posts, name="groups_posts"),
     path("new/", views.new_post, name="new_post"),
+    path("search/", views.search, name="search"),
+    path("follow/", views.follow_index, name="follow_index"),
     path("<str:username>/<int:post_id>/", views.post_view, name="post"),
     path("<str:username>/", views.profile, name="profile"),
+    path(
+        "<str:username>/follow/",
+        views.profile_follow,
+        name="profile_follow"
+    ),
+    path(
+        "<str:username>/unfollow/",
+        views.profile_unfollow,
+        name="profile_unfollow"
+    ),
     path(
         "<str:username>/<int:post_id>/edit/",
         views.post_edit,
@@ -1,18 +1,57 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
 
+from . import sharding
+from .cache import (anonymous_page_cache, attach_fragment_versions,
+                    author_generation_key, group_generation_key,
+                    index_generation_key)
+from .conditional import feed_condition, post_condition
+from .counters import author_posts_count, group_posts_count
+from .feeds import FeedQuery, merged_group_feed
 from .forms import PostForm
-from .models import Group, Post, User
+from .models import Follow, Group, Post, User
+from .paginator import CursorPaginator, UncountedPaginator
+from .search import SearchPaginator
+from .search import is_available as search_is_available
+from .timeline import TimelinePaginator, follow_counts, is_following
 
 POSTS_PER_PAGE = 10
 
+# Every group of a combined feed is read for each page
+MAX_MERGED_GROUPS = 10
 
-def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
+
+def paginate(request, posts, count=None):
+    # Old ?page=N links keep working when cursor pagination is enabled
+    if settings.POSTS_CURSOR_PAGINATION and "page" not in request.GET:
+        paginator = CursorPaginator(posts, POSTS_PER_PAGE)
+        page = paginator.get_page(
+            after=request.GET.get("after"),
+            before=request.GET.get("before")
+        )
+        attach_fragment_versions(page)
+        return paginator, page
+    if count is None and settings.POSTS_COUNT_FREE_PAGINATION:
+        paginator = UncountedPaginator(posts, POSTS_PER_PAGE)
+    else:
+        paginator = Paginator(posts, POSTS_PER_PAGE)
+    if count is not None:
+        paginator.count = count
     page_number = request.GET.get("page")
     page = paginator.get_page(page_number)
+    attach_fragment_versions(page)
+    return paginator, page
+
+
+@feed_condition(index_generation_key)
+@anonymous_page_cache(index_generation_key)
+def index(request):
+    post_list = FeedQuery.index().queryset()
+    paginator, page = paginate(request, post_list)
     return render(
         request,
         "index.html",
@@ -20,12 +59,14 @@ def index(request):
     )
 
 
+@feed_condition(group_generation_key)
+@anonymous_page_cache(group_generation_key)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, POSTS_PER_PAGE)
-    page_number = request.GET.get("page")
-    page = paginator.get_page(page_number)
+    group = get_object_or_404(
+        Group.objects.select_related("post_counter"), slug=slug
+    )
+    posts = FeedQuery.for_group(group).queryset()
+    paginator, page = paginate(request, posts, group_posts_count(group))
     context = {
         "group": group,
         "page": page,
@@ -34,6 +75,71 @@ def group_posts(request, slug):
     return render(request, "group.html", context)
 
 
+def groups_posts(request, slugs):
+    slugs = list(dict.fromkeys(slugs))
+    if len(slugs) > MAX_MERGED_GROUPS:
+        raise Http404
+    groups = Group.objects.in_bulk(slugs, field_name="slug")
+    if len(groups) != len(slugs):
+        raise Http404
+    groups = [groups[slug] for slug in slugs]
+    paginator = CursorPaginator(merged_group_feed(groups), POSTS_PER_PAGE)
+    page = paginator.get_page(
+        after=request.GET.get("after"),
+        before=request.GET.get("before")
+    )
+    attach_fragment_versions(page)
+    return render(request, "groups.html", {
+        "groups": groups,
+        "page": page,
+        "paginator": paginator,
+    })
+
+
+def search(request):
+    query = request.GET.get("q", "").strip()
+    if search_is_available():
+        paginator = SearchPaginator(query, POSTS_PER_PAGE)
+    else:
+        posts = FeedQuery.index().queryset()
+        posts = posts.filter(text__icontains=query) if query else posts.none()
+        paginator = CursorPaginator(posts, POSTS_PER_PAGE)
+    page = paginator.get_page(
+        after=request.GET.get("after"),
+        before=request.GET.get("before")
+    )
+    attach_fragment_versions(page)
+    return render(request, "search.html", {
+        "query": query,
+        "page": page,
+        "paginator": paginator,
+    })
+
+
+def author_card(request, author):
+    followers_count, following_count = follow_counts(author)
+    return {
+        "author": author,
+        "followers_count": followers_count,
+        "following_count": following_count,
+        "following": is_following(request.user, author),
+    }
+
+
+@login_required
+def follow_index(request):
+    paginator = TimelinePaginator(request.user, POSTS_PER_PAGE)
+    page = paginator.get_page(
+        after=request.GET.get("after"),
+        before=request.GET.get("before")
+    )
+    attach_fragment_versions(page)
+    return render(request, "follow.html", {
+        "page": page,
+        "paginator": paginator,
+    })
+
+
 @login_required
 def new_post(request):
     form = PostForm(request.POST or None)
@@ -48,37 +154,54 @@ def new_post(request):
     })
 
 
+@feed_condition(author_generation_key)
+@anonymous_page_cache(author_generation_key)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    paginator = Paginator(posts, POSTS_PER_PAGE)
-    page_number = request.GET.get("page")
-    page = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related("post_counter", "follow_counter"),
+        username=username
+    )
+    count_posts = author_posts_count(author)
+    posts = FeedQuery.for_author(author).queryset()
+    paginator, page = paginate(request, posts, count_posts)
     return render(request, "profile.html", {
-        "author": author,
+        **author_card(request, author),
         "page": page,
         "paginator": paginator,
-        "count_posts": posts.count
+        "count_posts": count_posts
     })
 
 
+@post_condition
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    count_posts = post.author.posts.count
+    post = get_object_or_404(
+        sharding.route_username(
+            Post.objects.select_related(
+                "author__post_counter", "author__follow_counter"
+            ),
+            username
+        ),
+        id=post_id
+    )
+    count_posts = author_posts_count(post.author)
     return render(
         request,
         "post.html",
         {
+            **author_card(request, post.author),
             "post": post,
             "count_posts": count_posts,
-            "author": post.author
         }
     )
 
 
 @login_required
 def post_edit(request, username, post_id):
-    post_edit = get_object_or_404(Post, author__username=username, id=post_id)
+    post_edit = get_object_or_404(
+        sharding.route_username(Post.objects.all(), username),
+        author__username=username,
+        id=post_id
+    )
     if request.user.username != username:
         return redirect("post", username, post_id)
     form = PostForm(request.POST or None, instance=post_edit)
@@ -94,3 +217,23 @@ def post_edit(request, username, post_id):
         "form": form,
         "post_edit": post_edit,
     })
+
+
+@login_required
+@require_POST
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect("profile", username)
+
+
+@login_required
+@require_POST
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    follow = Follow.objects.filter(user=request.user, author=author).first()
+    if follow is not None:
+        # Deleted one by one, so the signals update the counts
+        follow.delete()
+    return redirect("profile", username)
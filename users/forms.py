@@ -1,9 +1,20 @@
 from django.contrib.auth.forms import UserCreationForm
+from django.forms import ValidationError
 
 from posts.models import User
 
+# Top-level pages of the site and the API; profiles of users with these
+# names would be hidden behind them
+RESERVED_USERNAMES = ("search", "follow", "posts", "export")
+
 
 class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ("first_name", "last_name", "username", "email")
+
+    def clean_username(self):
+        username = self.cleaned_data["username"]
+        if username.lower() in RESERVED_USERNAMES:
+            raise ValidationError("Это имя занято страницей сайта")
+        return username
@@ -1,3 +1,20 @@
 from django.test import TestCase
 
-# Create your tests here.
+from users.forms import RESERVED_USERNAMES, CreationForm
+
+
+class CreationFormTest(TestCase):
+    def form(self, username):
+        return CreationForm(data={
+            "username": username,
+            "password1": "Zx9!long-password",
+            "password2": "Zx9!long-password",
+        })
+
+    def test_reserved_usernames(self):
+        for username in RESERVED_USERNAMES:
+            with self.subTest(username=username):
+                form = self.form(username)
+                self.assertFalse(form.is_valid())
+                self.assertIn("username", form.errors)
+        self.assertTrue(self.form("reader").is_valid())
@@ -0,0 +1,164 @@
+"""
+Benchmark of every page of the site.
+
+Each URL of ``BENCHMARK_URLCONFS`` is requested through the test client by a
+guest and by the author of the sample post. For every page the latency
+percentiles, the number of SQL queries and the response size are recorded,
+so runs on different datasets or settings can be compared as JSON.
+"""
+
+import importlib
+import platform
+import statistics
+import time
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+BENCHMARK_URLCONFS = ("posts.urls", "users.urls", "about.urls")
+
+HOST = "localhost"
+
+# Only answer POST requests
+SKIPPED_URL_NAMES = ("profile_follow", "profile_unfollow")
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def sample_kwargs(post):
+    slug = post.group.slug if post.group else None
+    slugs = None
+    if slug is not None:
+        # The combined feed of the sample group and another one
+        other = (
+            Group.objects.exclude(pk=post.group_id)
+            .values_list("slug", flat=True)
+            .first()
+        )
+        slugs = [slug, other or slug]
+    return {
+        "username": post.author.username,
+        "post_id": post.id,
+        "slug": slug,
+        "slugs": slugs,
+    }
+
+
+def benchmark_urls(post):
+    """(url name, path) for every pattern, filled from the sample post."""
+    samples = sample_kwargs(post)
+    for urlconf in BENCHMARK_URLCONFS:
+        module = importlib.import_module(urlconf)
+        namespace = getattr(module, "app_name", None)
+        for pattern in module.urlpatterns:
+            name = pattern.name
+            if namespace:
+                name = f"{namespace}:{name}"
+            if name in SKIPPED_URL_NAMES:
+                continue
+            kwargs = {
+                key: samples.get(key)
+                for key in pattern.pattern.converters
+            }
+            if None in kwargs.values():
+                continue
+            yield name, reverse(name, kwargs=kwargs)
+
+
+def response_size(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def measure(client, path, runs, cold):
+    timings = []
+    for _ in range(runs):
+        if cold:
+            for cache in caches.all():
+                cache.clear()
+        started = time.perf_counter()
+        response = client.get(path, HTTP_HOST=HOST)
+        size = response_size(response)
+        timings.append((time.perf_counter() - started) * 1000)
+    if cold:
+        for cache in caches.all():
+            cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        client.get(path, HTTP_HOST=HOST)
+    return {
+        "status": response.status_code,
+        "bytes": size,
+        "queries": len(queries),
+        "latency_ms": {
+            "min": min(timings),
+            "p50": statistics.median(timings),
+            "p95": percentile(timings, 0.95),
+            "max": max(timings),
+        },
+    }
+
+
+def run(runs=20, cold=False):
+    post = Post.objects.select_related("author", "group").filter(
+        group__isnull=False
+    ).first() or Post.objects.select_related("author", "group").first()
+    if post is None:
+        raise ValueError("Нет записей: сначала выполните seed")
+    guest = Client()
+    author = Client()
+    author.force_login(post.author)
+    results = []
+    for name, path in benchmark_urls(post):
+        for viewer, client in (("guest", guest), ("author", author)):
+            result = measure(client, path, runs, cold)
+            result.update(url_name=name, path=path, viewer=viewer)
+            results.append(result)
+    return {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "posts": Post.objects.count(),
+            "runs": runs,
+            "cold": cold,
+            "settings": {
+                name: getattr(settings, name) for name in dir(settings)
+                if name.startswith("POSTS_")
+            },
+        },
+        "results": results,
+    }
+
+
+def compare(previous, current):
+    """p50 latency and query count changes of ``current`` against
+    ``previous``, keyed by (url name, viewer)."""
+    before = {
+        (result["url_name"], result["viewer"]): result
+        for result in previous["results"]
+    }
+    for result in current["results"]:
+        old = before.get((result["url_name"], result["viewer"]))
+        if old is None:
+            continue
+        yield {
+            "url_name": result["url_name"],
+            "viewer": result["viewer"],
+            "p50_ratio": (
+                result["latency_ms"]["p50"] / old["latency_ms"]["p50"]
+            ),
+            "queries_delta": result["queries"] - old["queries"],
+            "bytes_delta": result["bytes"] - old["bytes"],
+        }
@@ -0,0 +1,192 @@
+"""
+Reader throughput of SQLite under concurrent writes.
+
+The primary is copied into a scratch file once per backend profile, then
+reader threads run the first page of the index feed while writer threads
+keep publishing posts, as during a ``new_post`` burst. Every thread has
+its own connection of the profile's backend. Reads and writes that failed
+with "database is locked" are counted as errors.
+"""
+
+import os
+import platform
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+import django
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.utils import load_backend
+from django.utils import timezone
+
+from posts.feeds import FEED_FIELDS
+from posts.models import Post, User
+from posts.views import POSTS_PER_PAGE
+
+from .benchmark import percentile
+
+# Rollback journal and Django's defaults against yatube.sqlite
+PROFILES = {
+    "stock": {"ENGINE": "django.db.backends.sqlite3", "OPTIONS": {}},
+    "tuned": {"ENGINE": "yatube.sqlite", "OPTIONS": {}},
+}
+
+WRITE_SQL = (
+    f"INSERT INTO {Post._meta.db_table} "
+    "(text, pub_date, updated, author_id, group_id) "
+    "VALUES (%s, %s, %s, %s, NULL)"
+)
+
+
+def feed_sql():
+    posts = (
+        Post.objects.select_related("author", "group")
+        .only(*FEED_FIELDS)[:POSTS_PER_PAGE]
+    )
+    return posts.query.get_compiler(DEFAULT_DB_ALIAS).as_sql()
+
+
+def copy_primary(path):
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    target = sqlite3.connect(path)
+    try:
+        source.connection.backup(target)
+        # A copy of a WAL primary is in WAL mode as well
+        target.execute("PRAGMA journal_mode = delete")
+    finally:
+        target.close()
+
+
+def open_connection(profile, path):
+    settings_dict = {
+        **connections.databases[DEFAULT_DB_ALIAS],
+        **PROFILES[profile],
+        "NAME": path,
+        "CONN_MAX_AGE": 0,
+    }
+    backend = load_backend(settings_dict["ENGINE"])
+    return backend.DatabaseWrapper(settings_dict, f"contention_{profile}")
+
+
+class Worker(threading.Thread):
+    def __init__(self, profile, path, stop):
+        super().__init__(daemon=True)
+        self.profile = profile
+        self.path = path
+        self.stop = stop
+        self.timings = []
+        self.errors = 0
+
+    def run(self):
+        # Connections belong to the thread that opens them
+        self.connection = open_connection(self.profile, self.path)
+        try:
+            while not self.stop.is_set():
+                started = time.perf_counter()
+                try:
+                    self.step()
+                except OperationalError:
+                    self.errors += 1
+                    continue
+                self.timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            self.connection.close()
+
+
+class Reader(Worker):
+    def __init__(self, profile, path, stop, query):
+        super().__init__(profile, path, stop)
+        self.sql, self.params = query
+
+    def step(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(self.sql, self.params)
+            cursor.fetchall()
+
+
+class Writer(Worker):
+    def __init__(self, profile, path, stop, author_id):
+        super().__init__(profile, path, stop)
+        self.author_id = author_id
+
+    def step(self):
+        now = timezone.now()
+        with self.connection.cursor() as cursor:
+            # BEGIN as Django's atomic() issues it for the backend
+            self.connection._start_transaction_under_autocommit()
+            try:
+                cursor.execute(
+                    WRITE_SQL, ["Запись под нагрузкой", now, now,
+                                self.author_id]
+                )
+            except OperationalError:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+
+
+def summary(workers, seconds):
+    timings = [value for worker in workers for value in worker.timings]
+    result = {
+        "per_second": len(timings) / seconds,
+        "errors": sum(worker.errors for worker in workers),
+    }
+    if timings:
+        result["latency_ms"] = {
+            "p50": statistics.median(timings),
+            "p95": percentile(timings, 0.95),
+            "max": max(timings),
+        }
+    return result
+
+
+def measure(profile, directory, seconds, readers, writers, author_id):
+    path = os.path.join(directory, f"{profile}.sqlite3")
+    copy_primary(path)
+    stop = threading.Event()
+    query = feed_sql()
+    reader_threads = [
+        Reader(profile, path, stop, query) for _ in range(readers)
+    ]
+    writer_threads = [
+        Writer(profile, path, stop, author_id) for _ in range(writers)
+    ]
+    threads = reader_threads + writer_threads
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        "profile": profile,
+        "reads": summary(reader_threads, seconds),
+        "writes": summary(writer_threads, seconds),
+    }
+
+
+def run(seconds=10, readers=4, writers=2, profiles=tuple(PROFILES)):
+    author_id = User.objects.values_list("id", flat=True).first()
+    if author_id is None:
+        raise ValueError("Нет пользователей: сначала выполните seed")
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            measure(profile, directory, seconds, readers, writers, author_id)
+            for profile in profiles
+        ]
+    return {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "posts": Post.objects.count(),
+            "seconds": seconds,
+            "readers": readers,
+            "writers": writers,
+        },
+        "results": results,
+    }
@@ -0,0 +1,269 @@
+"""
+Replay of recorded or generated traffic against the WSGI application.
+
+Requests are taken from an access log (any format that quotes the request
+line, like nginx, Apache or runserver logs) or generated from the current
+database. They are sent straight to ``yatube.wsgi.application`` from a
+pool of threads or forked processes, without a server in between. Posts to
+``new_post`` and ``post_edit`` are sent with a logged-in session of the
+author and a CSRF token.
+"""
+
+import collections
+import io
+import multiprocessing
+import random
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import unquote_to_bytes, urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY
+from django.contrib.auth import SESSION_KEY as USER_SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import connections
+from django.urls import Resolver404, resolve, reverse
+from django.utils.crypto import get_random_string
+
+from posts.models import Group, Post, User
+from yatube.benchmark import HOST, percentile
+
+REQUEST_LINE = re.compile(r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+"')
+
+WRITE_VIEWS = ("new_post", "post_edit")
+
+# Share of each page in a generated mix
+MIX = (
+    ("index", 40),
+    ("group_posts", 15),
+    ("profile", 15),
+    ("post", 20),
+    ("search", 3),
+    ("new_post", 4),
+    ("post_edit", 3),
+)
+
+Request = collections.namedtuple("Request", "method path user")
+Result = collections.namedtuple("Result", "name status seconds")
+
+
+def view_name(path):
+    try:
+        return resolve(urlsplit(path).path).view_name
+    except Resolver404:
+        return "unknown"
+
+
+def from_log(lines, default_user):
+    """Requests of an access log.
+
+    GETs are replayed as they are; a POST can only be replayed for the
+    write views, with a generated body, and is skipped otherwise.
+    """
+    for line in lines:
+        match = REQUEST_LINE.search(line)
+        if match is None:
+            continue
+        method, path = match.group("method", "path")
+        if method not in ("GET", "HEAD", "POST"):
+            continue
+        user = None
+        if method == "POST":
+            try:
+                found = resolve(urlsplit(path).path)
+            except Resolver404:
+                continue
+            if found.view_name not in WRITE_VIEWS:
+                continue
+            user = found.kwargs.get("username", default_user)
+        yield Request(method, path, user)
+
+
+def generated_mix(count, seed=0):
+    rng = random.Random(seed)
+    posts = list(
+        Post.objects.order_by("-id")
+        .values_list("id", "author__username")[:1000]
+    )
+    slugs = list(Group.objects.values_list("slug", flat=True)[:100])
+    if not posts:
+        raise ValueError("Нет записей: сначала выполните seed")
+    names, weights = zip(*MIX)
+    for name in rng.choices(names, weights, k=count):
+        post_id, username = rng.choice(posts)
+        if name == "index":
+            yield Request("GET", reverse("index"), None)
+        elif name == "group_posts" and slugs:
+            yield Request("GET", reverse(
+                "group_posts", kwargs={"slug": rng.choice(slugs)}
+            ), None)
+        elif name == "search":
+            yield Request(
+                "GET", reverse("search") + "?" + urlencode({"q": "лес"}), None
+            )
+        elif name == "new_post":
+            yield Request("POST", reverse("new_post"), username)
+        elif name == "post_edit":
+            yield Request("POST", reverse("post_edit", kwargs={
+                "username": username, "post_id": post_id
+            }), username)
+        elif name == "post":
+            yield Request("GET", reverse("post", kwargs={
+                "username": username, "post_id": post_id
+            }), None)
+        else:
+            yield Request("GET", reverse(
+                "profile", kwargs={"username": username}
+            ), None)
+
+
+def login_session(user):
+    session = SessionStore()
+    session[USER_SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return session.session_key
+
+
+def open_sessions(requests):
+    usernames = {request.user for request in requests if request.user}
+    return {
+        user.username: login_session(user)
+        for user in User.objects.filter(username__in=usernames)
+    }
+
+
+def environ_for(request, session_key, csrf_token):
+    url = urlsplit(request.path)
+    body = b""
+    if request.method == "POST":
+        body = urlencode({
+            "text": f"Нагрузочная запись {time.time_ns()}", "group": ""
+        }).encode()
+    cookies = [f"{settings.CSRF_COOKIE_NAME}={csrf_token}"]
+    if session_key:
+        cookies.append(f"{settings.SESSION_COOKIE_NAME}={session_key}")
+    return {
+        "REQUEST_METHOD": request.method,
+        "PATH_INFO": unquote_to_bytes(url.path).decode("iso-8859-1"),
+        "QUERY_STRING": url.query,
+        "SERVER_NAME": HOST,
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": HOST,
+        "HTTP_COOKIE": "; ".join(cookies),
+        "HTTP_X_CSRFTOKEN": csrf_token,
+        "CONTENT_TYPE": "application/x-www-form-urlencoded",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+
+
+def call(application, request, session_key, csrf_token):
+    status = []
+
+    def start_response(response_status, headers, exc_info=None):
+        status.append(int(response_status.split()[0]))
+
+    started = time.perf_counter()
+    try:
+        body = application(
+            environ_for(request, session_key, csrf_token), start_response
+        )
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+    except Exception:
+        status = [None]
+    return Result(
+        view_name(request.path), status[0], time.perf_counter() - started
+    )
+
+
+def replay_slice(requests, sessions):
+    from yatube.wsgi import application
+
+    csrf_token = get_random_string(32)
+    return [
+        call(application, request, sessions.get(request.user), csrf_token)
+        for request in requests
+    ]
+
+
+def worker(requests, sessions):
+    try:
+        return replay_slice(requests, sessions)
+    finally:
+        connections.close_all()
+
+
+def summarize(results, seconds):
+    by_name = collections.defaultdict(list)
+    for result in results:
+        by_name[result.name].append(result)
+    report = {}
+    for name, group in sorted(by_name.items()):
+        timings = [result.seconds * 1000 for result in group]
+        errors = sum(
+            1 for result in group
+            if result.status is None or result.status >= 500
+        )
+        report[name] = {
+            "count": len(group),
+            "errors": errors,
+            "error_rate": errors / len(group),
+            "statuses": dict(collections.Counter(
+                str(result.status) for result in group
+            )),
+            "latency_ms": {
+                "p50": statistics.median(timings),
+                "p95": percentile(timings, 0.95),
+                "p99": percentile(timings, 0.99),
+            },
+        }
+    return {
+        "requests": len(results),
+        "seconds": seconds,
+        "throughput": len(results) / seconds if seconds else 0,
+        "by_name": report,
+    }
+
+
+def replay(requests, workers=4, mode="thread"):
+    """Send ``requests`` from ``workers`` threads or processes; each worker
+    takes an interleaved share, so the mix stays the same in every one."""
+    requests = list(requests)
+    sessions = open_sessions(requests)
+    slices = [requests[number::workers] for number in range(workers)]
+    started = time.perf_counter()
+    if workers == 1:
+        results = replay_slice(requests, sessions)
+    else:
+        if mode == "process":
+            # Children must not share the parent's database connections
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("fork")
+            )
+        else:
+            pool = ThreadPoolExecutor(workers)
+        with pool:
+            results = [
+                result
+                for part in pool.map(worker, slices,
+                                     [sessions] * workers)
+                for result in part
+            ]
+    return summarize(results, time.perf_counter() - started)
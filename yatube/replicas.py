@@ -0,0 +1,108 @@
+"""
+Read replicas.
+
+Views listed in DATABASE_REPLICA_VIEWS read from one of the
+DATABASE_REPLICAS aliases while DATABASE_REPLICA_READS is on; everything
+else, and every write, goes to the primary. After a session writes
+anything it reads from the primary for DATABASE_REPLICA_STICKY_SECONDS, so
+a user sees their own post before the replicas catch up.
+
+On one machine the replicas are SQLite files refreshed from the primary
+with the online backup API by ``manage.py sync_replicas``.
+"""
+
+import contextvars
+import random
+import sqlite3
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.transaction import TransactionManagementError
+
+# Replica alias of the current request, None outside of replica views
+current_replica = contextvars.ContextVar("current_replica", default=None)
+
+STICKY_SESSION_KEY = "_primary_until"
+
+# Sessions are written on every login; reading them from a lagging copy
+# would log users out.
+PRIMARY_ONLY_APPS = ("sessions",)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        return current_replica.get()
+
+    def db_for_write(self, model, **hints):
+        # Also for instances that were read from a replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def is_sticky(request):
+    if not request.session.session_key:
+        return False
+    return request.session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+class ReplicaMiddleware:
+    """Points reads of replica views at a random replica and makes a
+    session sticky to the primary after it writes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_replica.reset(token)
+        if (request.method not in ("GET", "HEAD", "OPTIONS")
+                and response.status_code < 400
+                and request.user.is_authenticated):
+            request.session[STICKY_SESSION_KEY] = (
+                time.time() + settings.DATABASE_REPLICA_STICKY_SECONDS
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (settings.DATABASE_REPLICA_READS
+                and settings.DATABASE_REPLICAS
+                and request.method in ("GET", "HEAD")
+                and request.resolver_match.view_name
+                in settings.DATABASE_REPLICA_VIEWS
+                and not is_sticky(request)):
+            current_replica.set(random.choice(settings.DATABASE_REPLICAS))
+
+
+def sync_replica(alias, pages=-1):
+    """Copy the primary into the SQLite file of replica ``alias``.
+
+    The backup API copies a consistent snapshot while the primary keeps
+    taking writes, and readers of the replica see either the old or the
+    new copy.
+    """
+    source = connections[DEFAULT_DB_ALIAS]
+    if source.in_atomic_block:
+        # The backup would wait for the open transaction forever
+        raise TransactionManagementError(
+            "Replicas can't be synced inside a transaction."
+        )
+    source.ensure_connection()
+    target = sqlite3.connect(settings.DATABASES[alias]["NAME"])
+    try:
+        source.connection.backup(target, pages=pages)
+    finally:
+        target.close()
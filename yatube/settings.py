@@ -38,6 +38,7 @@ ALLOWED_HOSTS = [
 INSTALLED_APPS = [
     'users',
     'posts',
+    'perf',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -47,11 +48,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'perf.profiling.ProfilerMiddleware',
+    'perf.memory.MemoryMiddleware',
+    'perf.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yatube.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -61,7 +66,7 @@ ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'perf.templates.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,13 +86,104 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Stock SQLite unless YATUBE_SQLITE_TUNED is set. yatube.sqlite adds WAL
+# and tuned pragmas, see yatube/sqlite/base.py, and begins transactions
+# IMMEDIATE, so read-only atomic() blocks wait for writers as well. With it
+# connections are kept open between requests for YATUBE_CONN_MAX_AGE
+# seconds.
+if os.environ.get('YATUBE_SQLITE_TUNED'):
+    SQLITE_DATABASE = {
+        'ENGINE': 'yatube.sqlite',
+        'CONN_MAX_AGE': int(os.environ.get('YATUBE_CONN_MAX_AGE', 60)),
+    }
+else:
+    SQLITE_DATABASE = {
+        'ENGINE': 'django.db.backends.sqlite3',
+    }
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        **SQLITE_DATABASE,
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     }
 }
 
+# A read replica: a copy of the primary file refreshed by
+# `manage.py sync_replicas`. Tests read it through the primary.
+DATABASES['replica'] = {
+    **SQLITE_DATABASE,
+    'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+    'TEST': {
+        'MIRROR': 'default',
+    },
+}
+
+# Post shards, see posts.sharding. Posts stay on the primary unless
+# YATUBE_SHARDS is set; `manage.py rebalance_shards` moves them after the
+# list changes.
+POSTS_SHARD_ALIASES = [
+    f'shard{number}'
+    for number in range(int(os.environ.get('YATUBE_SHARD_COUNT', 2)))
+]
+
+for alias in POSTS_SHARD_ALIASES:
+    DATABASES[alias] = {
+        **SQLITE_DATABASE,
+        'NAME': os.path.join(BASE_DIR, f'db.{alias}.sqlite3'),
+    }
+
+POSTS_SHARDS = POSTS_SHARD_ALIASES if os.environ.get('YATUBE_SHARDS') else []
+
+DATABASE_ROUTERS = [
+    'posts.sharding.ShardRouter',
+    'yatube.replicas.ReplicaRouter',
+]
+
+DATABASE_REPLICAS = ['replica']
+
+# Read-only views read from the replicas when YATUBE_REPLICA_READS is set
+DATABASE_REPLICA_READS = bool(os.environ.get('YATUBE_REPLICA_READS'))
+
+DATABASE_REPLICA_VIEWS = [
+    'index',
+    'group_posts',
+    'profile',
+    'post',
+    'search',
+    'about:author',
+    'about:tech',
+    'api:index',
+    'api:group_posts',
+    'api:profile',
+]
+
+# Seconds a session reads from the primary after it writes; longer than
+# the replica refresh interval
+DATABASE_REPLICA_STICKY_SECONDS = 30
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+# perf.cache.LocMemCache is the local-memory backend counting hits and
+# misses for Server-Timing. It evicts the least recently used entries once
+# MAX_ENTRIES is reached, so hot posts stay cached on a single box.
+CACHES = {
+    'default': {
+        'BACKEND': 'perf.cache.LocMemCache',
+        'LOCATION': 'default',
+    },
+    'fragments': {
+        'BACKEND': 'perf.cache.LocMemCache',
+        'LOCATION': 'fragments',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -134,3 +230,115 @@ LOGIN_REDIRECT_URL = "index"
 
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+# Keyset pagination of feeds by (pub_date, id) with ?after=/?before= tokens
+POSTS_CURSOR_PAGINATION = False
+
+# Cache alias for rendered post fragments
+POSTS_FRAGMENT_CACHE = "fragments"
+
+# Cache alias for the version tokens of posts, authors and groups that
+# fragment keys are built from, and for the feed generations that retire
+# cached pages. Every process must see the same tokens, or a change made in
+# one worker leaves the fragments and pages cached by another one in use:
+# with the local-memory backends above the site is correct only as a
+# single process. Several workers need this alias and the fragments on a
+# shared backend (memcached, Redis, the database cache).
+POSTS_VERSION_CACHE = "fragments"
+
+# Seconds to keep whole feed pages for anonymous visitors, 0 disables it.
+# Needs a shared POSTS_VERSION_CACHE, see the posts.E001 check.
+POSTS_PAGE_CACHE_TIMEOUT = 0
+
+# ETag and Last-Modified for feeds and posts, with 304 answers to
+# conditional GETs. Needs a shared POSTS_VERSION_CACHE as well.
+POSTS_CONDITIONAL_GET = False
+
+# The same for the feeds of the JSON API, whose clients poll them. On by
+# default: API pages carry no session state. Several workers need a shared
+# POSTS_VERSION_CACHE for it, like the rest of the caching above.
+API_CONDITIONAL_GET = True
+
+# Estimated counts and cursor navigation in the posts admin changelists
+POSTS_ADMIN_SCALE_MODE = False
+
+# Numbered pages without COUNT(*) for feeds that have no stored counter
+POSTS_COUNT_FREE_PAGINATION = False
+
+# Follow feeds, see posts.timeline. New posts are copied into the timelines
+# of followers POSTS_TIMELINE_BATCH_SIZE at a time by
+# `manage.py fanout_timelines --interval N`, or by a background thread of
+# the web process when POSTS_TIMELINE_FANOUT_THREAD is on. The thread is off
+# by default: its writes compete with requests for the SQLite write lock
+# and may fail with "database is locked"; the queue keeps the jobs then.
+# Posts of authors with POSTS_TIMELINE_FANOUT_LIMIT followers or more are
+# read on request instead.
+POSTS_TIMELINE_FANOUT_THREAD = False
+POSTS_TIMELINE_BATCH_SIZE = 1000
+POSTS_TIMELINE_FANOUT_LIMIT = 10000
+
+# Latest posts of an author copied into the timeline of a new follower
+POSTS_TIMELINE_BACKFILL = 50
+
+# Share of requests measured by perf.middleware.ServerTimingMiddleware,
+# from 0 (off) to 1 (every request)
+PERF_SAMPLE_RATE = 0
+
+# Latency, query count and size histograms per URL name served at /metrics.
+# Off by default: every request is instrumented while it is on.
+PERF_METRICS = False
+
+# Directory the worker processes of one host share their metrics through,
+# None keeps them per process
+PERF_METRICS_DIR = None
+
+PERF_METRICS_FLUSH_INTERVAL = 1
+
+# Addresses allowed to read /metrics besides staff users. REMOTE_ADDR is
+# the address of the proxy in front of the site when there is one, so only
+# list scrapers that reach the workers directly.
+PERF_METRICS_IPS = []
+
+# Staff requests flagged with X-Profile or ?_profile are stack-sampled every
+# PERF_PROFILE_INTERVAL seconds, at most PERF_PROFILE_MAX_SAMPLES times;
+# only the latest PERF_PROFILE_KEEP profiles are stored.
+PERF_PROFILE_INTERVAL = 0.001
+PERF_PROFILE_MAX_SAMPLES = 10000
+PERF_PROFILE_KEEP = 50
+
+# Share of requests whose allocations are traced with tracemalloc, 0 is off.
+# Each keeps its peak and PERF_MEMORY_TOP_SITES allocation sites found
+# through PERF_MEMORY_FRAMES frames; the latest PERF_MEMORY_KEEP are stored.
+PERF_MEMORY_SAMPLE_RATE = 0
+PERF_MEMORY_FRAMES = 25
+PERF_MEMORY_TOP_SITES = 10
+PERF_MEMORY_KEEP = 500
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'perf': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        # Phase timings of YATUBE_WARMUP at worker start
+        'yatube.warmup': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Opt-in: django-debug-toolbar from requirements.txt for local profiling
+if DEBUG and os.environ.get('YATUBE_DEBUG_TOOLBAR'):
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.insert(3, 'debug_toolbar.middleware.DebugToolbarMiddleware')
+    INTERNAL_IPS = ['127.0.0.1', '::1']
@@ -0,0 +1,94 @@
+"""
+Warm-up of a freshly started worker.
+
+Loads every template into the template loaders, populates the URL resolvers
+and builds the password validators, so that the first requests after a
+deploy don't pay for it. Database connections are left alone: warm-up runs
+at import, before a pre-forking server starts its workers, which must not
+share them.
+
+Phase timings are logged by the ``yatube.warmup`` logger.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.password_validation import (
+    get_default_password_validators
+)
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import NoReverseMatch, get_resolver, reverse
+
+logger = logging.getLogger(__name__)
+
+
+def load_templates():
+    loaded = 0
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if not name.endswith((".html", ".txt")):
+                        continue
+                    path = os.path.join(root, name)
+                    template_name = os.path.relpath(path, directory)
+                    try:
+                        engine.get_template(template_name)
+                    except (TemplateDoesNotExist, TemplateSyntaxError):
+                        continue
+                    loaded += 1
+    return loaded
+
+
+def url_names(resolver, namespace=""):
+    for key in resolver.reverse_dict:
+        if isinstance(key, str):
+            yield namespace + key
+    for name, (_, sub_resolver) in resolver.namespace_dict.items():
+        yield from url_names(sub_resolver, f"{namespace}{name}:")
+
+
+def resolve_urls():
+    resolved = 0
+    for name in set(url_names(get_resolver())):
+        try:
+            reverse(name)
+        except NoReverseMatch:
+            # Patterns with arguments are compiled by now all the same
+            pass
+        resolved += 1
+    return resolved
+
+
+def load_password_validators():
+    return len(get_default_password_validators())
+
+
+PHASES = (
+    ("templates", load_templates),
+    ("urls", resolve_urls),
+    ("password_validators", load_password_validators),
+)
+
+
+@contextmanager
+def timer():
+    started = time.perf_counter()
+    result = {}
+    yield result
+    result["seconds"] = time.perf_counter() - started
+
+
+def warm_up():
+    report = {}
+    for name, phase in PHASES:
+        with timer() as result:
+            result["items"] = phase()
+        report[name] = result
+        logger.info(
+            "warm-up %s: %d items in %.3fs",
+            name, result["items"], result["seconds"]
+        )
+    return report
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# Opt-in: warm the worker up before it takes traffic
+if os.environ.get('YATUBE_WARMUP'):
+    from yatube.warmup import warm_up
+    warm_up()